@@ -3,6 +3,7 @@ import os
 import sys
 import json
 import uuid
+import copy
 import threading
 import logging
 import zipfile
@@ -10,23 +11,28 @@ import requests
 import io
 import shutil
 import psutil # Added for system info
-import subprocess
 from PIL import Image
 from werkzeug.utils import secure_filename
 from mcstatus import JavaServer
 import time # Added for log rotation timestamp
 from datetime import datetime # More specific import for timestamp format
 import glob
+from concurrent.futures import ThreadPoolExecutor
 
 from flask import Flask, jsonify, request, abort, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
+from . import json_utils
+from .http_utils import create_session
+from .java_utils import get_java_version
 from .minecraft import MinecraftRunner
 from .mod_manager import ModManager
-from .update_manager import check_github_for_updates, download_file, install_modpack, get_local_version
+from .update_manager import check_github_for_updates, invalidate_update_cache, download_file, remove_downloaded_file, install_modpack, get_local_version
 from .paths import (
     get_data_dir, get_config_path, get_renders_dir,
-    get_mods_dir, ensure_directories_exist, get_initial_config_path, get_game_dir
+    get_mods_dir, get_disabled_mods_dir, ensure_directories_exist, get_initial_config_path, get_game_dir,
+    get_managed_mods_path
 )
 # Удалён импорт IntegrityChecker
 
@@ -38,15 +44,61 @@ STEVE_SKIN_URL = "https://crafatar.com/skins/8667ba71-b85a-4004-a454-48534ac7a78
 ELY_BY_AUTH_URL = "https://authserver.ely.by/auth/authenticate"
 SKIN_RENDER_SCALE = 10
 REQUEST_TIMEOUT_SECONDS = 10
+HTTP_POOL_SIZE = 32
+SERVER_THREADS = 8
 
 logger = logging.getLogger(__name__)
-http_session = requests.Session()
+
+# Shared session: keeps TLS connections to skin/auth hosts alive between requests.
+http_session = create_session(HTTP_POOL_SIZE, HTTP_POOL_SIZE, retries=2, mount_http=True)
 
 # --- Flask App Setup ---
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that uses orjson for API responses and request bodies when it is installed."""
+    def dumps(self, obj, **kwargs):
+        orjson = json_utils.orjson
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if json_utils.orjson is None:
+            return super().loads(s, **kwargs)
+        return json_utils.orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonJSONProvider(app)
 CORS(app, resources={r"/api/*": {"origins": "http://localhost:9002"}})
 
 # --- Logging Setup ---
+LOG_FILE_BUFFER_SIZE = 64 * 1024
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that lets records accumulate in a large write buffer instead of flushing after each one.
+    Records at flush_level and above are still flushed immediately, so errors reach the disk right away.
+    """
+    def __init__(self, filename, mode='a', encoding=None, buffer_size=LOG_FILE_BUFFER_SIZE, flush_level=logging.WARNING):
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        super().__init__(filename, mode=mode, encoding=encoding)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size, encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= self.flush_level:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
 def setup_logging(is_debug_mode=False):
     """Configures the application's logging, creating a new timestamped log file for each session."""
     config = load_config()  # Получаем конфиг
@@ -71,7 +123,7 @@ def setup_logging(is_debug_mode=False):
         level=log_level,
         format='%(asctime)s - %(name)-15s - %(levelname)-8s - %(message)s',
         handlers=[
-            logging.FileHandler(log_file_path, mode='w', encoding='utf-8'),
+            BufferedFileHandler(log_file_path, mode='w', encoding='utf-8'),
             logging.StreamHandler(sys.stdout)
         ],
         force=True
@@ -93,19 +145,20 @@ class AppState:
         self.version_info = {"minecraft": "N/A", "fabric": "N/A"}
         self.is_game_installed = False
         self.build_tag = None  # Новое поле для версии сборки
+        self._mrpack_stat = None  # (path, mtime_ns, size) of the mrpack version_info was read from
 
     def get_all(self):
-        with self._lock:
-            config = load_config()
-            build_tag = config.get('current_build_tag')
-            return {
-                "is_processing": self.is_processing,
-                "status_text": self.status_text,
-                "progress": self.progress,
-                "version_info": self.version_info,
-                "is_game_installed": self.is_game_installed,
-                "build_tag": build_tag,
-            }
+        # Reads don't take the lock: each attribute read is atomic, and the config
+        # is loaded outside any critical section so pollers never queue behind disk I/O.
+        build_tag = load_config().get('current_build_tag')
+        return {
+            "is_processing": self.is_processing,
+            "status_text": self.status_text,
+            "progress": self.progress,
+            "version_info": self.version_info,
+            "is_game_installed": self.is_game_installed,
+            "build_tag": build_tag,
+        }
 
     def start_processing(self, initial_status="Starting..."):
         with self._lock:
@@ -131,10 +184,15 @@ class AppState:
         with self._lock:
             self.progress = int(progress_float * 100)
     
-    def set_version_info(self, versions):
+    def set_version_info(self, versions, mrpack_stat=None):
         with self._lock:
             if versions:
                 self.version_info = versions
+                self._mrpack_stat = mrpack_stat
+
+    def is_version_info_current(self, mrpack_stat):
+        with self._lock:
+            return mrpack_stat is not None and self._mrpack_stat == mrpack_stat
 
     def set_installed_status(self, installed):
         with self._lock:
@@ -143,10 +201,19 @@ class AppState:
 app_state = AppState()
 
 # --- Helper Functions ---
+_TOTAL_RAM_MB = None  # Total system memory doesn't change at runtime, so it is read once
+
+def _get_total_ram_mb():
+    """Returns total system RAM in MB, querying psutil only on the first call."""
+    global _TOTAL_RAM_MB
+    if _TOTAL_RAM_MB is None:
+        _TOTAL_RAM_MB = psutil.virtual_memory().total // (1024 * 1024)
+    return _TOTAL_RAM_MB
+
 def _get_default_java_settings():
     """Calculates smart default RAM settings based on system memory."""
     try:
-        total_ram_mb = psutil.virtual_memory().total // (1024 * 1024)
+        total_ram_mb = _get_total_ram_mb()
         # 40% of total RAM
         default_max_ram = total_ram_mb * 0.4
         # Clamp between 2GB and 8GB
@@ -162,23 +229,62 @@ def _get_default_java_settings():
 
 
 # --- Config Management ---
+# Parsed config is cached in memory and re-read only when the file on disk changes.
+_CONFIG_CACHE = {'stat': None, 'data': None}
+_config_cache_lock = threading.Lock()
+_config_save_lock = threading.Lock()
+
+def _get_config_file_stat(path):
+    """Returns a (path, mtime_ns, size) key for the config file, or None if it can't be stat'ed."""
+    try:
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _store_config_cache(config_path, config_data, config_stat=None):
+    """Remembers the given config together with the stat of the file it came from."""
+    if config_stat is None:
+        config_stat = _get_config_file_stat(config_path)
+    with _config_cache_lock:
+        _CONFIG_CACHE['stat'] = config_stat
+        _CONFIG_CACHE['data'] = copy.deepcopy(config_data)
+
 def save_config(config_data):
-    """Saves config and creates a backup of the previous one."""
+    """
+    Saves config atomically and keeps the previous one as a backup.
+    The new content is written to a temp file first, so a crash never leaves a half-written config.
+    """
     config_path = get_config_path()
     backup_path = config_path + '.bak'
+    logger.info(f"[save_config] Сохраняю конфиг в: {config_path}")
+    logger.debug(f"[save_config] Ключи для сохранения: {list(config_data.keys())}")
+    data = json_utils.dumps(config_data)
+    # Writers are serialized, and the live file is never moved away: a concurrent load_config
+    # always sees either the old or the new config, never a gap that sends it to the backup.
+    with _config_save_lock:
+        try:
+            _backup_config_file(config_path, backup_path)
+            json_utils.write_bytes_atomic(config_path, data)
+            _store_config_cache(config_path, config_data)
+            logger.info("Configuration saved successfully.")
+        except OSError as e:
+            logger.error(f"Error saving config: {e}")
+
+def _backup_config_file(config_path, backup_path):
+    """Copies the current config to the backup, unless it is missing or unreadable (a broken file must not replace a good backup)."""
     try:
-        # Create backup
-        if os.path.exists(config_path):
-            shutil.copy2(config_path, backup_path)
-            logger.info(f"Config backup created at {backup_path}")
-        logger.info(f"[save_config] Сохраняю конфиг в: {config_path}")
-        logger.debug(f"[save_config] Ключи для сохранения: {list(config_data.keys())}")
-        # Save new config
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, indent=4)
-        logger.info("Configuration saved successfully.")
-    except (IOError, shutil.Error) as e:
-        logger.error(f"Error saving config: {e}")
+        with open(config_path, 'rb') as f:
+            current = f.read()
+        if not isinstance(json_utils.loads(current), dict):
+            return
+    except FileNotFoundError:
+        return
+    except ValueError:
+        logger.warning("Current config is corrupted, keeping the previous backup.")
+        return
+    json_utils.write_bytes_atomic(backup_path, current)
+    logger.info(f"Config backup created at {backup_path}")
 
 
 def load_config():
@@ -187,6 +293,12 @@ def load_config():
     Tries to restore from backup if the main config is invalid.
     """
     config_path = get_config_path()
+
+    # Fast path: the file hasn't changed since it was last parsed.
+    config_stat = _get_config_file_stat(config_path)
+    with _config_cache_lock:
+        if config_stat is not None and _CONFIG_CACHE['stat'] == config_stat:
+            return copy.deepcopy(_CONFIG_CACHE['data'])
     
     default_config = {
         'clientToken': str(uuid.uuid4()),
@@ -199,6 +311,10 @@ def load_config():
         },
         'current_build_tag': None,
         'current_mrpack_filename': None,
+        'minecraft_version': None,
+        'fabric_version': None,
+        'installed_build_tag': None,
+        'installed_mtime': None,
         'last_selected_uuid': None
     }
     
@@ -215,12 +331,12 @@ def load_config():
         if not os.path.exists(path):
             return None
         try:
-            with open(path, 'r', encoding='utf-8') as f:
+            with open(path, 'rb') as f:
                 content = f.read()
             if not content:
                 logging.warning(f"Config file is empty: {path}")
                 return None
-            config = json.loads(content)
+            config = json_utils.loads(content)
             if not isinstance(config, dict):
                 logging.error(f"Config file content is not a dictionary: {path}")
                 return None
@@ -257,6 +373,10 @@ def load_config():
         },
         'current_build_tag': None,
         'current_mrpack_filename': None,
+        'minecraft_version': None,
+        'fabric_version': None,
+        'installed_build_tag': None,
+        'installed_mtime': None,
         'last_selected_uuid': None
     }
 
@@ -292,11 +412,19 @@ def load_config():
     if needs_save:
         logging.info("Config was missing keys, defaults have been added. Saving.")
         save_config(config)
+    else:
+        # Use the stat taken before reading so a concurrent write is never masked.
+        _store_config_cache(config_path, config, config_stat)
 
     return config
 
 
 # --- Skin Rendering ---
+# Crop boxes of body parts on a 64x64 skin texture
+_PART_COORDS = { 'head': (8, 8, 16, 16), 'torso': (20, 20, 28, 32), 'r_arm': (44, 20, 48, 32), 'r_leg': (4, 20, 8, 32), 'l_arm': (36, 52, 40, 64), 'l_leg': (20, 52, 24, 64), 'head_ov': (40, 8, 48, 16), 'torso_ov': (20, 36, 28, 48), 'r_arm_ov': (44, 36, 48, 48), 'r_leg_ov': (4, 36, 8, 48), 'l_arm_ov': (52, 52, 56, 64), 'l_leg_ov': (4, 52, 8, 64) }
+# Overlay layers of a modern skin and where they go on the 16x32 front view
+_OVERLAY_PLACEMENT = (('torso_ov', (4, 8)), ('l_arm_ov', (0, 8)), ('r_arm_ov', (12, 8)), ('l_leg_ov', (4, 20)), ('r_leg_ov', (8, 20)))
+
 def render_skin_front_view(skin_image: Image.Image) -> Image.Image:
     scale = SKIN_RENDER_SCALE
     if skin_image.mode != 'RGBA': skin_image = skin_image.convert('RGBA')
@@ -305,40 +433,108 @@ def render_skin_front_view(skin_image: Image.Image) -> Image.Image:
         skin_image = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
         skin_image.paste(old_skin, (0, 0))
     is_legacy = skin_image.getpixel((0, 32))[3] == 0
-    assembled = Image.new('RGBA', (16, 32), (0, 0, 0, 0))
-    part_coords = { 'head': (8, 8, 16, 16), 'torso': (20, 20, 28, 32), 'r_arm': (44, 20, 48, 32), 'r_leg': (4, 20, 8, 32), 'l_arm': (36, 52, 40, 64), 'l_leg': (20, 52, 24, 64), 'head_ov': (40, 8, 48, 16), 'torso_ov': (20, 36, 28, 48), 'r_arm_ov': (44, 36, 48, 48), 'r_leg_ov': (4, 36, 8, 48), 'l_arm_ov': (52, 52, 56, 64), 'l_leg_ov': (4, 52, 8, 64) }
-    head = skin_image.crop(part_coords['head']); torso = skin_image.crop(part_coords['torso']); r_arm = skin_image.crop(part_coords['r_arm']); r_leg = skin_image.crop(part_coords['r_leg']); l_arm = skin_image.crop(part_coords['l_arm']) if not is_legacy else r_arm.transpose(Image.Transpose.FLIP_LEFT_RIGHT); l_leg = skin_image.crop(part_coords['l_leg']) if not is_legacy else r_leg.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
-    assembled.paste(head, (4, 0)); assembled.paste(torso, (4, 8)); assembled.paste(l_arm, (0, 8)); assembled.paste(r_arm, (12, 8)); assembled.paste(l_leg, (4, 20)); assembled.paste(r_leg, (8, 20))
-    head_ov = skin_image.crop(part_coords['head_ov'])
+    # Base and overlay parts are copied into two layers with plain (unmasked) pastes,
+    # then the overlay layer is pasted once using its own alpha as the mask. Overlay parts don't
+    # intersect, so this equals the former per-part masked pastes, including semi-transparent pixels.
+    base = Image.new('RGBA', (16, 32), (0, 0, 0, 0))
+    overlay = Image.new('RGBA', (16, 32), (0, 0, 0, 0))
+    r_arm = skin_image.crop(_PART_COORDS['r_arm']); r_leg = skin_image.crop(_PART_COORDS['r_leg'])
+    l_arm = r_arm.transpose(Image.Transpose.FLIP_LEFT_RIGHT) if is_legacy else skin_image.crop(_PART_COORDS['l_arm'])
+    l_leg = r_leg.transpose(Image.Transpose.FLIP_LEFT_RIGHT) if is_legacy else skin_image.crop(_PART_COORDS['l_leg'])
+    base.paste(skin_image.crop(_PART_COORDS['head']), (4, 0)); base.paste(skin_image.crop(_PART_COORDS['torso']), (4, 8))
+    base.paste(l_arm, (0, 8)); base.paste(r_arm, (12, 8)); base.paste(l_leg, (4, 20)); base.paste(r_leg, (8, 20))
+    overlay.paste(skin_image.crop(_PART_COORDS['head_ov']), (4, 0))
     if not is_legacy:
-        torso_ov = skin_image.crop(part_coords['torso_ov']); r_arm_ov = skin_image.crop(part_coords['r_arm_ov']); r_leg_ov = skin_image.crop(part_coords['r_leg_ov']); l_arm_ov = skin_image.crop(part_coords['l_arm_ov']); l_leg_ov = skin_image.crop(part_coords['l_leg_ov'])
-        assembled.paste(torso_ov, (4, 8), torso_ov); assembled.paste(l_arm_ov, (0, 8), l_arm_ov); assembled.paste(r_arm_ov, (12, 8), r_arm_ov); assembled.paste(l_leg_ov, (4, 20), l_leg_ov); assembled.paste(r_leg_ov, (8, 20), r_leg_ov)
-    assembled.paste(head_ov, (4, 0), head_ov)
-    return assembled.resize((16 * scale, 32 * scale), Image.Resampling.NEAREST)
+        for part, dest in _OVERLAY_PLACEMENT:
+            overlay.paste(skin_image.crop(_PART_COORDS[part]), dest)
+    base.paste(overlay, (0, 0), overlay)
+    return base.resize((16 * scale, 32 * scale), Image.Resampling.NEAREST)
 
 # --- Helper Functions ---
+_MRPACK_PATH_CACHE = {}  # game_dir -> (dir_mtime_ns, mrpack_path)
+
 def _get_mrpack_path(config):
     game_dir = get_game_dir(config)
     if not game_dir: return None # If game dir is not set, no mrpack can exist
     filename = config.get('current_mrpack_filename')
     if filename:
         path = os.path.join(game_dir, filename)
-        if os.path.exists(path): return path
-    # Fallback to searching the directory
-    for f in os.listdir(game_dir):
-        if f.endswith(".mrpack"): return os.path.join(game_dir, f)
-    return None
-
-def _is_game_installed():
-    config = load_config()
+        if os.path.isfile(path): return path
+    # Fallback to searching the directory; its listing only changes together with its mtime
+    try:
+        dir_mtime = os.stat(game_dir).st_mtime_ns
+    except OSError:
+        return None
+    cached = _MRPACK_PATH_CACHE.get(game_dir)
+    if cached and cached[0] == dir_mtime: return cached[1]
+    matches = glob.glob(os.path.join(glob.escape(game_dir), '*.mrpack'))
+    path = matches[0] if matches else None
+    _MRPACK_PATH_CACHE[game_dir] = (dir_mtime, path)
+    return path
+
+INSTALL_CHECK_TTL_SECONDS = 2.0
+_INSTALL_CHECK = {'at': 0.0, 'game_dir': None, 'result': False}
+
+def _invalidate_install_cache():
+    _INSTALL_CHECK['at'] = 0.0
+
+def _is_game_installed(config=None):
+    if config is None:
+        config = load_config()
     game_dir = get_game_dir(config)
     if not game_dir: return False
-    return os.path.exists(os.path.join(game_dir, "versions"))
+    # The versions dir only appears on install, so a short-lived cached answer is enough for polling
+    now = time.monotonic()
+    if _INSTALL_CHECK['game_dir'] == game_dir and now - _INSTALL_CHECK['at'] < INSTALL_CHECK_TTL_SECONDS:
+        return _INSTALL_CHECK['result']
+    result = os.path.exists(os.path.join(game_dir, "versions"))
+    _INSTALL_CHECK.update(at=now, game_dir=game_dir, result=result)
+    return result
+
+def _get_mods_dir_mtime(config):
+    try:
+        return os.stat(get_mods_dir(config)).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+def _has_installed_files(game_dir):
+    """The .version stamp exists and versions/ is not empty."""
+    if not os.path.exists(os.path.join(game_dir, ".version")):
+        return False
+    try:
+        with os.scandir(os.path.join(game_dir, "versions")) as entries:
+            return next(entries, None) is not None
+    except OSError:
+        return False
+
+def _is_installation_valid_fast(config, game_dir):
+    """
+    Cheap check for the common "same build, nothing touched since the last install" case:
+    the build tag stamped by _save_installation_version is still the current and the latest one,
+    the mods folder has not changed since then and the installed files are still there.
+    Only the .mrpack parse of the full check is skipped.
+    """
+    if not _has_installed_files(game_dir):
+        return False
+    installed_tag = config.get('installed_build_tag')
+    if not installed_tag or installed_tag != config.get('current_build_tag'):
+        return False
+    installed_mtime = config.get('installed_mtime')
+    if installed_mtime is None or installed_mtime != _get_mods_dir_mtime(config):
+        return False
+    try:
+        update_info = check_github_for_updates()
+    except Exception as e:
+        logger.error(f"Ошибка при проверке обновлений: {e}")
+        return False
+    return bool(update_info) and update_info['tag'] == installed_tag
 
 def _is_installation_valid(config):
     game_dir = get_game_dir(config)
     if not game_dir:
         return False
+    if _is_installation_valid_fast(config, game_dir):
+        return True
 
     # --- Новая логика: сравниваем тег релиза ---
     try:
@@ -356,16 +552,14 @@ def _is_installation_valid(config):
         return False
 
     # --- Старая логика: сравниваем .version (MC/Fabric) ---
+    if not _has_installed_files(game_dir): return False
     version_file = os.path.join(game_dir, ".version")
-    if not os.path.exists(version_file): return False
-    versions_dir = os.path.join(game_dir, "versions")
-    if not os.path.exists(versions_dir) or len(os.listdir(versions_dir)) == 0: return False
     try:
         with open(version_file, 'r') as f:
             local_version = f.read().strip()
         mrpack_path = _get_mrpack_path(config)
-        if mrpack_path and os.path.exists(mrpack_path):
-            versions = _get_versions_from_mrpack(config)
+        if mrpack_path:
+            versions = _get_versions_from_mrpack(config, mrpack_path=mrpack_path)
             if not versions: return False # If mrpack is invalid, force reinstall
             expected_version = f"{versions.get('minecraft', 'unknown')}-{versions.get('fabric', 'unknown')}"
             return local_version == expected_version
@@ -383,24 +577,64 @@ def _save_installation_version(config):
         version_file = os.path.join(game_dir, ".version")
         with open(version_file, 'w') as f: f.write(version_string)
         logger.info(f"Сохранена версия установки: {version_string}")
+        # Отметка для быстрой проверки при следующем запуске
+        config['installed_build_tag'] = config.get('current_build_tag')
+        config['installed_mtime'] = _get_mods_dir_mtime(config)
+        save_config(config)
     except Exception as e:
         logger.error(f"Ошибка сохранения версии: {e}")
 
-def _get_versions_from_mrpack(config):
-    mrpack_path = _get_mrpack_path(config)
+_MRPACK_VERSIONS_CACHE = {}  # (path, mtime_ns, size) -> versions; holds only the current mrpack
+
+def _get_mrpack_stat(mrpack_path):
+    """Returns a (path, mtime_ns, size) key for the mrpack, or None if it is missing."""
+    if not mrpack_path:
+        return None
+    try:
+        st = os.stat(mrpack_path)
+        return (mrpack_path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _get_versions_from_mrpack(config, mrpack_path=None):
+    """Reads MC/loader versions from the mrpack; pass mrpack_path if it is already resolved."""
+    if mrpack_path is None:
+        mrpack_path = _get_mrpack_path(config)
     if not mrpack_path: return None
+    mrpack_stat = _get_mrpack_stat(mrpack_path)
+    cached = _MRPACK_VERSIONS_CACHE.get(mrpack_stat) if mrpack_stat else None
+    if cached:
+        return dict(cached)
     try:
         with zipfile.ZipFile(mrpack_path, 'r') as mrpack:
-            with mrpack.open('modrinth.index.json') as index_file:
-                index_data = json.load(index_file)
-                return {'minecraft': index_data['dependencies']['minecraft'], 'fabric': index_data['dependencies'].get('fabric-loader') or index_data['dependencies'].get('forge')}
+            index_data = json_utils.loads(mrpack.read('modrinth.index.json'))
+            versions = {'minecraft': index_data['dependencies']['minecraft'], 'fabric': index_data['dependencies'].get('fabric-loader') or index_data['dependencies'].get('forge')}
+        if mrpack_stat:
+            _MRPACK_VERSIONS_CACHE.clear()
+            _MRPACK_VERSIONS_CACHE[mrpack_stat] = versions
+        return dict(versions)
     except Exception as e:
         logging.error(f"Error reading .mrpack file {mrpack_path}: {e}")
     return None
 
+def _get_installed_versions(config):
+    """Returns MC/loader versions stored at install time, reading the mrpack only if they are missing."""
+    if config.get('minecraft_version'):
+        return {'minecraft': config['minecraft_version'], 'fabric': config.get('fabric_version')}
+    return _get_versions_from_mrpack(config)
+
 def update_version_info_in_state(config):
-    versions = _get_versions_from_mrpack(config)
-    app_state.set_version_info(versions)
+    # Re-read modrinth.index.json only when the mrpack file itself has changed.
+    mrpack_path = _get_mrpack_path(config)
+    mrpack_stat = _get_mrpack_stat(mrpack_path)
+    if app_state.is_version_info_current(mrpack_stat):
+        return
+    versions = _get_versions_from_mrpack(config, mrpack_path=mrpack_path)
+    app_state.set_version_info(versions, mrpack_stat)
+
+def _accounts_index_by_uuid(config):
+    """Maps account UUID to its position in config['accounts']."""
+    return {acc['uuid']: i for i, acc in enumerate(config.get('accounts', []))}
 
 # --- API Endpoints ---
 
@@ -423,7 +657,7 @@ def open_logs_directory():
 def get_status():
     config = load_config()
     update_version_info_in_state(config)
-    app_state.set_installed_status(_is_game_installed())
+    app_state.set_installed_status(_is_game_installed(config))
     return jsonify(app_state.get_all())
 
 @app.route('/api/config', methods=['GET', 'POST', 'PATCH'])
@@ -446,6 +680,8 @@ def config_endpoint():
                 config[key] = value
         logger.info(f"Game settings updated via API: {config.get('game_settings')}")
         save_config(config)
+        if 'java_settings' in updates:
+            MinecraftRunner.invalidate_java_cache()
         # --- ГАРАНТИРУЕМ создание папки клиента ---
         if get_game_dir(config):
             ensure_directories_exist(config)
@@ -462,11 +698,10 @@ def delete_account(account_uuid):
     try: uuid.UUID(account_uuid)
     except ValueError: abort(400, "Invalid UUID format")
     
-    accounts = config.get('accounts', [])
-    initial_len = len(accounts)
-    accounts = [acc for acc in accounts if acc['uuid'] != account_uuid]
-    if len(accounts) == initial_len: abort(404, "Account not found")
-    config['accounts'] = accounts
+    account_index = _accounts_index_by_uuid(config).get(account_uuid)
+    if account_index is None: abort(404, "Account not found")
+    accounts = config['accounts']
+    accounts.pop(account_index)
     if config.get('last_selected_uuid') == account_uuid: config['last_selected_uuid'] = accounts[0]['uuid'] if accounts else None
     
     renders_dir = get_renders_dir()
@@ -508,10 +743,10 @@ def auth_elyby():
             return jsonify({'error': 'Получен неверный ответ от сервера авторизации.'}), 500
         account_data = {'type': 'ely.by', 'username': auth_data['selectedProfile']['name'], 'uuid': auth_data['selectedProfile']['id'], 'accessToken': auth_data['accessToken'], 'clientToken': auth_data['clientToken']}
         accounts = config.get('accounts', [])
-        if any(acc['uuid'] == account_data['uuid'] for acc in accounts): return jsonify({'error': 'Этот аккаунт уже добавлен.'}), 409
+        if account_data['uuid'] in _accounts_index_by_uuid(config): return jsonify({'error': 'Этот аккаунт уже добавлен.'}), 409
         skin_url = f"http://skinsystem.ely.by/skins/{account_data['username']}.png"
         logger.info(f"Пробую скачать и отрендерить скин для {account_data['username']} ({account_data['uuid']})")
-        _render_and_cache_skin(skin_url, account_data['uuid'])
+        _skin_executor.submit(_render_and_cache_skin, skin_url, account_data['uuid'])
         accounts.append(account_data)
         config['accounts'] = accounts
         if len(accounts) == 1 or not config.get('last_selected_uuid'): config['last_selected_uuid'] = account_data['uuid']
@@ -523,24 +758,49 @@ def auth_elyby():
         return jsonify({'error': f'Ошибка сети при подключении к Ely.by: {e}'}), 500
 
 # --- Skin Rendering ---
+# Skins are rendered off the request path; /api/skin serves Steve until the render lands.
+_skin_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="skin-render")
+_STEVE_PNG_BYTES = None  # Rendered fallback skin, filled on first miss
+_steve_lock = threading.Lock()
+
 def _get_renders_dir_safe(config=None):
     return get_renders_dir()
 
+def _download_and_render_skin(skin_url):
+    """
+    Downloads a skin and renders its front view.
+    Skins are a few KB and Pillow needs a seekable file, so the body is read whole rather than streamed.
+    """
+    with http_session.get(skin_url, allow_redirects=True, timeout=REQUEST_TIMEOUT_SECONDS) as skin_response:
+        skin_response.raise_for_status()
+        with Image.open(io.BytesIO(skin_response.content)) as skin_image:
+            return render_skin_front_view(skin_image)
+
 def _render_and_cache_skin(skin_url, user_uuid):
     renders_dir = get_renders_dir()
     os.makedirs(renders_dir, exist_ok=True)
     try:
         logger.info(f"Пробую скачать скин по адресу: {skin_url} для UUID: {user_uuid}")
-        skin_response = http_session.get(skin_url, stream=True, allow_redirects=True, timeout=REQUEST_TIMEOUT_SECONDS)
-        skin_response.raise_for_status()
-        with Image.open(io.BytesIO(skin_response.content)) as skin_image:
-            rendered_skin = render_skin_front_view(skin_image)
-            render_path = os.path.join(renders_dir, f"{user_uuid}.png")
-            rendered_skin.save(render_path, "PNG")
-            logger.info(f"Rendered and cached skin for UUID {user_uuid} at {render_path}")
+        rendered_skin = _download_and_render_skin(skin_url)
+        render_path = os.path.join(renders_dir, f"{user_uuid}.png")
+        rendered_skin.save(render_path, "PNG")
+        logger.info(f"Rendered and cached skin for UUID {user_uuid} at {render_path}")
     except Exception as e:
         logger.error(f"Could not download or render skin for UUID {user_uuid} from {skin_url}: {e}")
 
+def _get_steve_png_bytes():
+    """Downloads and renders the fallback Steve skin once, then serves it from memory."""
+    global _STEVE_PNG_BYTES
+    if _STEVE_PNG_BYTES is not None:
+        return _STEVE_PNG_BYTES
+    with _steve_lock:
+        if _STEVE_PNG_BYTES is None:
+            logger.info(f"Пробую скачать дефолтный скин Steve: {STEVE_SKIN_URL}")
+            img_io = io.BytesIO()
+            _download_and_render_skin(STEVE_SKIN_URL).save(img_io, 'PNG')
+            _STEVE_PNG_BYTES = img_io.getvalue()
+    return _STEVE_PNG_BYTES
+
 @app.route('/api/skin/<user_uuid>', methods=['GET'])
 def get_rendered_skin(user_uuid):
     renders_dir = get_renders_dir()
@@ -550,16 +810,9 @@ def get_rendered_skin(user_uuid):
         return send_file(render_path, mimetype='image/png')
     logger.warning(f"Rendered skin for {user_uuid} not found in '{renders_dir}'. Serving fallback Steve.")
     try:
-        logger.info(f"Пробую скачать дефолтный скин Steve: {STEVE_SKIN_URL}")
-        skin_response = http_session.get(STEVE_SKIN_URL, stream=True, timeout=REQUEST_TIMEOUT_SECONDS)
-        skin_response.raise_for_status()
-        with Image.open(io.BytesIO(skin_response.content)) as skin_image:
-            rendered_skin = render_skin_front_view(skin_image)
-            img_io = io.BytesIO()
-            rendered_skin.save(img_io, 'PNG')
-            img_io.seek(0)
-            logger.info(f"Отдаю fallback Steve skin для UUID {user_uuid}")
-            return send_file(img_io, mimetype='image/png')
+        steve_png = _get_steve_png_bytes()
+        logger.info(f"Отдаю fallback Steve skin для UUID {user_uuid}")
+        return send_file(io.BytesIO(steve_png), mimetype='image/png')
     except Exception as e:
         logger.error(f"Could not serve fallback Steve skin: {e}")
         abort(404, "Rendered skin not found and fallback failed.")
@@ -580,37 +833,17 @@ def get_server_status():
 @app.route('/api/system-info', methods=['GET'])
 def get_system_info():
     try:
-        mem = psutil.virtual_memory()
-        total_ram_mb = mem.total // (1024 * 1024)
-        return jsonify({'total_ram_mb': total_ram_mb})
+        return jsonify({'total_ram_mb': _get_total_ram_mb()})
     except Exception as e:
         logging.error(f"Could not get system RAM info: {e}")
         return jsonify({'total_ram_mb': 8192})
 
 def check_system_java():
-    import shutil, subprocess, re
     java_path = shutil.which("javaw.exe") or shutil.which("java.exe")
     if not java_path:
         return False, "Java не найдена. Установите Java 21+."
     try:
-        result = subprocess.run([java_path, "-version"], capture_output=True, text=True, timeout=5)
-        version_lines = (result.stderr or result.stdout or "").splitlines()
-        version_line = version_lines[0] if version_lines else ''
-        logger.info(f"Путь: {java_path}, java -version: {version_lines}")
-        # Новый парсер: ищем версию между кавычками, потом после openjdk/java, потом просто первую цифру
-        match = re.search(r'version\\s+\"([^\"]+)\"', version_line)
-        if match:
-            version_str = match.group(1)
-            logger.info(f"Парсер: найдено по кавычкам: {version_str}")
-        else:
-            match = re.search(r'(?:openjdk|java)[^\d]*(\d+(?:\.\d+)+)', version_line, re.IGNORECASE)
-            if match:
-                version_str = match.group(1)
-                logger.info(f"Парсер: найдено по openjdk/java: {version_str}")
-            else:
-                match = re.search(r'(\d+)', version_line)
-                version_str = match.group(1) if match else version_line.strip() or "?"
-                logger.info(f"Парсер: найдено по первой цифре: {version_str}")
+        version_line, version_str = get_java_version(java_path)
         try:
             major = int(version_str.split('.')[0])
         except Exception:
@@ -653,98 +886,143 @@ def detect_java():
     else:
         return jsonify({"found": False, "message": message})
 
+JAVA_PROBE_WORKERS = 8
+_JAVA_SCAN_CACHE = {'key': None, 'results': None}
+_java_scan_lock = threading.Lock()
+
+def _get_java_scan_cache_key(path_env, java_paths):
+    """Builds a key that changes whenever PATH, JAVA_HOME or any candidate executable changes."""
+    stamped = []
+    for java_path in sorted(java_paths):
+        try:
+            stamped.append((java_path, os.stat(java_path).st_mtime_ns))
+        except OSError:
+            stamped.append((java_path, None))
+    return (path_env, os.environ.get('JAVA_HOME', ''), tuple(stamped))
+
+def _get_java_scan_cache_path():
+    return os.path.join(get_data_dir(), 'cache', 'java_scan.json')
+
+def _load_java_scan_cache():
+    """
+    Preloads the Java scan results saved by a previous run into _JAVA_SCAN_CACHE.
+    The stored key holds every executable's mtime, so a moved or updated Java simply misses the cache.
+    """
+    try:
+        with open(_get_java_scan_cache_path(), 'rb') as f:
+            data = json_utils.loads(f.read())
+        cache_key = (data['path_env'], data['java_home'], tuple((path, mtime) for path, mtime in data['stamped']))
+        results = data['results']
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать кеш поиска Java: {e}")
+        return
+    with _java_scan_lock:
+        _JAVA_SCAN_CACHE.update(key=cache_key, results=results)
+    logger.info(f"Загружен кеш поиска Java: {len(results)} шт.")
+
+def _save_java_scan_cache(cache_key, results):
+    """Atomically writes the Java scan results next to the other launcher data."""
+    path_env, java_home, stamped = cache_key
+    try:
+        json_utils.write_json_atomic(_get_java_scan_cache_path(),
+                                     {'path_env': path_env, 'java_home': java_home, 'stamped': stamped, 'results': results})
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить кеш поиска Java: {e}")
+
+# Папки вендоров JDK и префикс имени папки конкретной установки
+JAVA_VENDOR_ROOTS = [
+    (r"%ProgramFiles%\Java", "jdk-"),
+    (r"%ProgramFiles%\Eclipse Adoptium", "jdk-"),
+    (r"%ProgramFiles%\Microsoft", "jdk-"),
+    (r"%ProgramFiles(x86)%\Java", "jdk-"),
+    (r"C:\Program Files\Zulu", "zulu-"),
+]
+
+def _find_java_in_bin_dir(bin_dir):
+    """Возвращает javaw.exe из папки, а если его нет - java.exe; None, если нет ни того, ни другого."""
+    for exe in ("javaw.exe", "java.exe"):
+        java_path = os.path.join(bin_dir, exe)
+        if os.path.isfile(java_path):
+            return os.path.abspath(java_path)
+    return None
+
+def _scan_java_vendor_roots():
+    """Ищет Java в стандартных папках вендоров, читая каждую папку один раз."""
+    found = set()
+    for root, prefix in JAVA_VENDOR_ROOTS:
+        root = os.path.expandvars(root)
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if not entry.name.lower().startswith(prefix) or not entry.is_dir():
+                        continue
+                    java_path = _find_java_in_bin_dir(os.path.join(entry.path, "bin"))
+                    if java_path:
+                        found.add(java_path)
+        except OSError:
+            continue
+    return found
+
+def _probe_java(java_path, path_dirs):
+    """Определяет версию одной Java и проверяет, лежит ли она в PATH."""
+    try:
+        _, version_str = get_java_version(java_path)
+        version_display = f"Java {version_str}"
+    except Exception as e:
+        version_display = f"Ошибка: {e}"
+        logger.error(f"Ошибка при определении версии Java для {java_path}: {e}")
+    # Проверяем, есть ли этот путь в PATH
+    is_in_path = os.path.normcase(os.path.abspath(os.path.dirname(java_path))) in path_dirs
+    return {
+        "path": java_path,
+        "version": version_display,
+        "is_in_path": is_in_path
+    }
+
 @app.route('/api/java/list', methods=['GET'])
 def list_java_versions():
-    import shutil, subprocess, re, os, glob
+    refresh = request.args.get('refresh') == '1'
     java_candidates = set()
     results = []
-    # 1. Все javaw.exe и java.exe из ВСЕХ путей PATH
+    # 1. По одной Java из каждой папки PATH (javaw.exe, если есть, иначе java.exe)
     path_env = os.environ.get("PATH", "")
     for dir_path in path_env.split(";"):
-        dir_path = dir_path.strip('"')
-        for exe in ["javaw.exe", "java.exe"]:
-            java_path = os.path.join(dir_path, exe)
-            if os.path.isfile(java_path):
-                java_candidates.add(os.path.abspath(java_path))
+        java_path = _find_java_in_bin_dir(dir_path.strip('"'))
+        if java_path:
+            java_candidates.add(java_path)
     # 2. Если ничего не найдено в PATH, ищем по стандартным папкам
     if not java_candidates:
-        search_patterns = [
-            r"%ProgramFiles%\Java\jdk-*\bin\javaw.exe",
-            r"%ProgramFiles%\Java\jdk-*\bin\java.exe",
-            r"%ProgramFiles%\Eclipse Adoptium\jdk-*\bin\javaw.exe",
-            r"%ProgramFiles%\Eclipse Adoptium\jdk-*\bin\java.exe",
-            r"%ProgramFiles%\Microsoft\jdk-*\bin\javaw.exe",
-            r"%ProgramFiles%\Microsoft\jdk-*\bin\java.exe",
-            r"%ProgramFiles(x86)%\Java\jdk-*\bin\javaw.exe",
-            r"%ProgramFiles(x86)%\Java\jdk-*\bin\java.exe",
-            r"C:\\Program Files\\Zulu\\zulu-*\\bin\\javaw.exe",
-            r"C:\\Program Files\\Zulu\\zulu-*\\bin\\java.exe",
-            r"C:\\Program Files\\Zulu\\zulu-24\\bin\\javaw.exe",
-            r"C:\\Program Files\\Zulu\\zulu-24\\bin\\java.exe",
-        ]
-        for pattern in search_patterns:
-            expanded = os.path.expandvars(pattern)
-            for found in glob.glob(expanded):
-                java_candidates.add(os.path.abspath(found))
-    # 3. Убираем дубли из одной папки (оставляем только javaw.exe если есть)
-    unique_dirs = {}
-    for path in java_candidates:
-        dir_path = os.path.dirname(path)
-        if dir_path not in unique_dirs:
-            unique_dirs[dir_path] = path
-        else:
-            # Если уже есть java.exe, а сейчас нашли javaw.exe — заменить на javaw.exe
-            if path.endswith('javaw.exe'):
-                unique_dirs[dir_path] = path
-    filtered_candidates = set(unique_dirs.values())
+        java_candidates.update(_scan_java_vendor_roots())
+    filtered_candidates = java_candidates
     logger.info(f"Найдено кандидатов Java: {filtered_candidates}")
-    # 4. Проверяем версии
-    for java_path in sorted(filtered_candidates):
-        try:
-            result = subprocess.run([java_path, "-version"], capture_output=True, text=True, timeout=5)
-            version_lines = (result.stderr or result.stdout or "").splitlines()
-            version_line = version_lines[0] if version_lines else ''
-            logger.info(f"Путь: {java_path}, java -version: {version_lines}")
-            # Новый парсер: ищем версию между кавычками, потом после openjdk/java, потом просто первую цифру
-            match = re.search(r'version\\s+\"([^\"]+)\"', version_line)
-            if match:
-                version_str = match.group(1)
-                logger.info(f"Парсер: найдено по кавычкам: {version_str}")
-            else:
-                match = re.search(r'(?:openjdk|java)[^\d]*(\d+(?:\.\d+)+)', version_line, re.IGNORECASE)
-                if match:
-                    version_str = match.group(1)
-                    logger.info(f"Парсер: найдено по openjdk/java: {version_str}")
-                else:
-                    match = re.search(r'(\d+)', version_line)
-                    version_str = match.group(1) if match else version_line.strip() or "?"
-                    logger.info(f"Парсер: найдено по первой цифре: {version_str}")
-            version_display = f"Java {version_str}"
-        except Exception as e:
-            version_display = f"Ошибка: {e}"
-            logger.error(f"Ошибка при определении версии Java для {java_path}: {e}")
-        # Проверяем, есть ли этот путь в PATH
-        is_in_path = False
-        for dir_path in path_env.split(";"):
-            dir_path = dir_path.strip('"')
-            if os.path.abspath(os.path.dirname(java_path)) == os.path.abspath(dir_path):
-                is_in_path = True
-                break
-        results.append({
-            "path": java_path,
-            "version": version_display,
-            "is_in_path": is_in_path
-        })
+    cache_key = _get_java_scan_cache_key(path_env, filtered_candidates)
+    with _java_scan_lock:
+        if not refresh and _JAVA_SCAN_CACHE['key'] == cache_key:
+            logger.info("Кандидаты Java не изменились, отдаю закешированный результат.")
+            return jsonify(_JAVA_SCAN_CACHE['results'])
+    # Нормализованные папки из PATH, чтобы проверка "есть ли Java в PATH" была O(1)
+    path_dirs = frozenset(os.path.normcase(os.path.abspath(d.strip('"'))) for d in path_env.split(os.pathsep) if d.strip('"'))
+    # 4. Проверяем версии (каждый probe - отдельный процесс JVM, поэтому запускаем их параллельно)
+    if filtered_candidates:
+        with ThreadPoolExecutor(max_workers=min(JAVA_PROBE_WORKERS, len(filtered_candidates))) as executor:
+            results = list(executor.map(lambda java_path: _probe_java(java_path, path_dirs), sorted(filtered_candidates)))
     logger.info(f"Результаты поиска Java: {results}")
+    with _java_scan_lock:
+        _JAVA_SCAN_CACHE.update(key=cache_key, results=results)
+    _save_java_scan_cache(cache_key, results)
     return jsonify(results)
 
 # --- Background Task Management ---
+# Reused worker threads for launch/verify. Single-flight is enforced by app_state, but a launch
+# task keeps its worker until the game exits (process.wait()), so there must be spare workers.
+_background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bg-task")
+
 def _run_task_in_background(target_func, args_tuple):
     if not app_state.start_processing():
         abort(429, "Another process is already running")
-    thread = threading.Thread(target=target_func, args=args_tuple)
-    thread.daemon = True
-    thread.start()
+    _background_executor.submit(target_func, *args_tuple)
     return jsonify({"message": "Process started"})
 
 @app.route('/api/launch', methods=['POST'])
@@ -754,8 +1032,9 @@ def launch_game():
     try: uuid.UUID(selected_account_uuid)
     except ValueError: abort(400, "Invalid account UUID format")
     config = load_config()
-    account = next((acc for acc in config['accounts'] if acc['uuid'] == selected_account_uuid), None)
-    if not account: abort(404, "Selected account not found")
+    account_index = _accounts_index_by_uuid(config).get(selected_account_uuid)
+    if account_index is None: abort(404, "Selected account not found")
+    account = config['accounts'][account_index]
     return _run_task_in_background(_threaded_launch, (account, config))
 
 @app.route('/api/verify-files', methods=['POST'])
@@ -766,10 +1045,12 @@ def verify_files():
     if not game_dir:
         return jsonify({"error": "Папка для игры не выбрана. Проверка невозможна."}), 400
     ensure_directories_exist(config)
+    # Явная проверка файлов всегда сверяется со свежим релизом
+    invalidate_update_cache()
     
     return _run_task_in_background(_threaded_verify, (config,))
 
-def _threaded_generic_install(config, runner: MinecraftRunner):
+def _threaded_generic_install(config, runner: MinecraftRunner, force_full=False):
     game_dir = get_game_dir(config)
     if not game_dir:
         raise RuntimeError("Game directory not set. Cannot install.")
@@ -786,9 +1067,11 @@ def _threaded_generic_install(config, runner: MinecraftRunner):
     if update_info and (update_info['tag'] != current_build_tag or not local_mrpack_path or update_type != "none"):
         reason = "новая версия" if update_info['tag'] != current_build_tag else "локальный файл отсутствует"
         app_state.set_status(f"Загрузка ({reason}): {update_info['tag']}...")
-        if local_mrpack_path and os.path.exists(local_mrpack_path):
+        # Файл с тем же именем не удаляем: download_file сам проверит на сервере, не изменился ли он
+        new_mrpack_path = os.path.join(game_dir, update_info['filename'])
+        if local_mrpack_path and os.path.exists(local_mrpack_path) and os.path.normcase(local_mrpack_path) != os.path.normcase(new_mrpack_path):
             try:
-                os.remove(local_mrpack_path)
+                remove_downloaded_file(local_mrpack_path)
                 logger.info(f"Удален старый файл модпака: {local_mrpack_path}")
             except OSError as e:
                 logging.warning(f"Не удалось удалить старый модпак {local_mrpack_path}: {e}")
@@ -812,28 +1095,36 @@ def _threaded_generic_install(config, runner: MinecraftRunner):
         logger.info("Обновление сборки не требуется")
         return
         
+    if force_full:
+        # Проверка файлов сверяет все файлы индекса, а не только изменившиеся по снимку
+        update_type = "full"
     update_type_ru = 'Инкрементальная' if update_type == 'incremental' else 'Полная'
     app_state.set_status(f"{update_type_ru} установка / проверка модов...")
     app_state.set_progress(0)
     final_mrpack_path = _get_mrpack_path(config)
     if not final_mrpack_path: raise Exception("Файл модпака (.mrpack) не найден. Подключитесь к интернету для его скачивания.")
     
-    install_modpack(final_mrpack_path, game_dir, progress_callback=app_state.set_progress, update_type=update_type, config=config)
-    update_version_info_in_state(config)
-    
-    versions = _get_versions_from_mrpack(load_config())
-    if not versions: raise Exception("Не удалось прочитать версии из .mrpack файла после установки.")
+    versions = install_modpack(final_mrpack_path, game_dir, progress_callback=app_state.set_progress, update_type=update_type, config=config)
+    _invalidate_install_cache()
+    if not versions or not versions.get('minecraft'): raise Exception("Не удалось прочитать версии из .mrpack файла после установки.")
+    # Индекс уже разобран при установке - повторно .mrpack не открываем
+    app_state.set_version_info(versions, _get_mrpack_stat(final_mrpack_path))
+    # Запоминаем версии, чтобы следующий запуск не открывал .mrpack
+    config['minecraft_version'] = versions['minecraft']
+    config['fabric_version'] = versions.get('fabric')
+    save_config(config)
     
     runner.set_versions(versions['minecraft'], versions.get('fabric'))
     app_state.set_status("Подготовка окружения Minecraft...")
     runner.install_minecraft_dependencies()
+    _invalidate_install_cache()
 
 def _threaded_verify(config):
     runner = None
     try:
         runner = MinecraftRunner(config=config, status_callback=app_state.set_status)
         if not runner.prepare_environment(): raise RuntimeError(runner.get_last_error())
-        _threaded_generic_install(config, runner)
+        _threaded_generic_install(config, runner, force_full=True)
         _save_installation_version(config)
         app_state.set_status("Проверка успешно завершена!")
     except Exception as e:
@@ -849,7 +1140,7 @@ def _threaded_verify(config):
 def _threaded_launch(account_info, config):
     launch_runner = None
     try:
-        versions = _get_versions_from_mrpack(config)
+        versions = _get_installed_versions(config)
         minecraft_version = versions['minecraft'] if versions else None
         fabric_version = versions.get('fabric') if versions else None
         launch_runner = MinecraftRunner(config=config, account_info=account_info, version=minecraft_version, fabric_version=fabric_version, status_callback=app_state.set_status)
@@ -887,12 +1178,55 @@ def _threaded_launch(account_info, config):
             app_state.finish_processing(final_status)
 
 # --- Mod Management ---
+_MODS_CACHE = {'entry': None}  # (cache_key, sorted mods), replaced as a whole
+
+def _get_mods_cache_key(config):
+    """
+    Key that changes whenever a file is added to, removed from or moved between the mods folders,
+    or managed_mods.json (which mods are marked as managed) is rewritten.
+    """
+    key = []
+    for dir_path in (get_mods_dir(config), get_disabled_mods_dir(config)):
+        try:
+            key.append((dir_path, os.stat(dir_path).st_mtime_ns))
+        except (OSError, TypeError):
+            key.append((dir_path, None))
+    key.append(_get_config_file_stat(get_managed_mods_path()))
+    return tuple(key)
+
+def _invalidate_mods_cache():
+    _MODS_CACHE['entry'] = None
+
+_MOD_MANAGER_CACHE = {'entry': None}  # (config stat, managed_mods.json stat, ModManager)
+_mod_manager_lock = threading.Lock()
+
+def _get_mod_manager():
+    """
+    Returns a ModManager reused across requests.
+    It only depends on the config (mods folders) and managed_mods.json, so it is rebuilt when either file changes.
+    Server threads share the instance; ModManager guards its folder snapshot with its own lock.
+    """
+    config_stat = _get_config_file_stat(get_config_path())
+    managed_stat = _get_config_file_stat(get_managed_mods_path())
+    with _mod_manager_lock:
+        cached = _MOD_MANAGER_CACHE['entry']
+        if cached and config_stat is not None and cached[0] == config_stat and cached[1] == managed_stat:
+            return cached[2]
+        mod_manager = ModManager(config=load_config())
+        _MOD_MANAGER_CACHE['entry'] = (config_stat, managed_stat, mod_manager)
+        return mod_manager
+
 @app.route('/api/mods', methods=['GET'])
 def get_mods():
     config = load_config()
-    mod_manager = ModManager(config=config)
-    mods = mod_manager.get_all_mods()
-    return jsonify(sorted(mods, key=lambda m: m.get('name', '')))
+    cache_key = _get_mods_cache_key(config)
+    cached = _MODS_CACHE['entry']
+    if cached and cached[0] == cache_key:
+        return jsonify(cached[1])
+    mod_manager = _get_mod_manager()
+    mods = sorted(mod_manager.get_all_mods(), key=lambda m: m.get('name', ''))
+    _MODS_CACHE['entry'] = (cache_key, mods)
+    return jsonify(mods)
 
 @app.route('/api/mods/state', methods=['POST'])
 def set_mod_state_json():
@@ -903,20 +1237,16 @@ def set_mod_state_json():
     if not filename or enable is None:
         logger.error(f"[API] Некорректные параметры запроса: filename={filename}, enable={enable}")
         return jsonify({"error": "Missing filename or enable parameter"}), 400
-    config = load_config()
-    mod_manager = ModManager(config=config)
+    mod_manager = _get_mod_manager()
     result = mod_manager.set_mod_state(filename, enable)
     if result:
+        _invalidate_mods_cache()
         logger.info(f"[API] Состояние мода '{filename}' успешно изменено (enable={enable})")
         return jsonify({"message": f"Mod {filename} state changed.", "success": True})
     else:
         logger.error(f"[API] Не удалось изменить состояние мода '{filename}' (enable={enable}). См. подробности выше.")
         return jsonify({"error": f"Mod {filename} not found or state change failed.", "success": False}), 404
 
-@app.before_request
-def log_request_info():
-    pass
-
 def run(debug_mode=False):
     """Starts the Flask server."""
     # Ensure data directories exist from the start, before logging
@@ -933,8 +1263,20 @@ def run(debug_mode=False):
     game_dir = config.get('game_settings', {}).get('game_directory')
     if game_dir:
         ensure_directories_exist(config)
+    _load_java_scan_cache()
 
-    app.run(host='127.0.0.1', port=5000, debug=debug_mode, use_reloader=False)
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+
+    if serve is not None:
+        # Production WSGI server: status polls keep flowing while long requests (Java scan, auth) run
+        logger.info(f"Serving with waitress ({SERVER_THREADS} threads).")
+        serve(app, host='127.0.0.1', port=5000, threads=SERVER_THREADS, channel_timeout=120)
+    else:
+        logger.warning("waitress is not installed, falling back to the Flask development server.")
+        app.run(host='127.0.0.1', port=5000, debug=debug_mode, use_reloader=False)
     logger.info("Backend server has stopped.")
 
     
\ No newline at end of file
@@ -0,0 +1,83 @@
+
+import time
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import json_utils
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Kristory-Launcher"
+
+
+def create_session(pool_connections, pool_maxsize, retries=3, backoff_factor=0.3, mount_http=False):
+    """
+    Создает requests.Session с пулом keep-alive соединений и повтором запросов на 502/503/504.
+    Каждый модуль держит одну такую сессию, чтобы TLS-рукопожатие не повторялось для каждого запроса.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=[502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    if mount_http:
+        session.mount('http://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+
+def _load_response_cache(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = json_utils.loads(f.read())
+        return cached if isinstance(cached, dict) and cached.get('body') is not None else None
+    except (OSError, ValueError):
+        return None
+
+def _save_response_cache(cache_path, etag, last_modified, body):
+    try:
+        json_utils.write_json_atomic(cache_path, {
+            'etag': etag, 'last_modified': last_modified, 'body': body, 'fetched_at': time.time()
+        })
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить кеш ответа {cache_path}: {e}")
+
+def cached_get(session, url, cache_path, parse=None, ttl=None, headers=None, stale_on_error=False, timeout=15):
+    """
+    Условный GET (If-None-Match/If-Modified-Since) с кешем результата на диске.
+    Ответ 304 пустой и не расходует лимит запросов GitHub, на него возвращается сохраненный результат.
+    parse(response) возвращает (результат, можно_ли_кешировать); по умолчанию кешируется response.json().
+    Кеш моложе ttl секунд возвращается без запроса. При stale_on_error сетевая ошибка
+    отдает устаревший кеш, если он есть, иначе исключение пробрасывается.
+    """
+    cached = _load_response_cache(cache_path)
+    if cached and ttl is not None and time.time() - cached.get('fetched_at', 0) < ttl:
+        return cached['body']
+
+    request_headers = dict(headers or {})
+    if cached:
+        if cached.get('etag'):
+            request_headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            request_headers['If-Modified-Since'] = cached['last_modified']
+    try:
+        response = session.get(url, headers=request_headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            logger.info(f"Ответ {url} не изменился (304), использую кеш.")
+            _save_response_cache(cache_path, cached.get('etag'), cached.get('last_modified'), cached['body'])
+            return cached['body']
+        response.raise_for_status()
+        body, cacheable = parse(response) if parse else (response.json(), True)
+    except requests.exceptions.RequestException as e:
+        if stale_on_error and cached:
+            logger.warning(f"Не удалось обновить ответ {url} ({e}), использую устаревший кеш.")
+            return cached['body']
+        raise
+
+    if cacheable and body is not None:
+        _save_response_cache(cache_path, response.headers.get('ETag'), response.headers.get('Last-Modified'), body)
+    return body
@@ -0,0 +1,75 @@
+
+import os
+import re
+import sys
+import logging
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+# `java -version`, который отвечает дольше, считаем сломанной JVM
+JAVA_PROBE_TIMEOUT_SECONDS = 3
+
+# subprocess.CREATE_NO_WINDOW существует только в Windows; флаг не дает мелькать консоли при запуске java.exe
+NO_WINDOW_FLAGS = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+# Разбор вывода `java -version`: версия в кавычках, после openjdk/java, просто первое число
+_JAVA_VER_QUOTED = re.compile(r'version\s+"([^"]+)"')
+_JAVA_VER_NAMED = re.compile(r'(?:openjdk|java)[^\d]*(\d+(?:\.\d+)+)', re.IGNORECASE)
+_JAVA_VER_DIGIT = re.compile(r'(\d+)')
+
+# (abs_path, mtime_ns, size) -> (version_line, version_str): неизменившаяся Java запускается один раз
+_JAVA_VERSION_CACHE = {}
+_java_version_lock = threading.Lock()
+
+
+def get_hidden_startupinfo():
+    """STARTUPINFO, скрывающий окно запущенного процесса в Windows; None на других ОС."""
+    if sys.platform != "win32":
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return startupinfo
+
+
+def parse_java_version(version_line):
+    """
+    Достает строку версии из первой строки `java -version`.
+    Ищем версию между кавычками, потом после openjdk/java, потом просто первую цифру.
+    Обычный вывод (`openjdk version "21.0.2" ...`) разбираем без регулярок.
+    """
+    _, quote_found, rest = version_line.partition('version "')
+    if quote_found:
+        return rest.partition('"')[0] or "?"
+    match = _JAVA_VER_QUOTED.search(version_line) or _JAVA_VER_NAMED.search(version_line)
+    if match:
+        return match.group(1)
+    match = _JAVA_VER_DIGIT.search(version_line)
+    return match.group(1) if match else version_line.strip() or "?"
+
+
+def get_java_version(java_path):
+    """
+    Запускает `java -version` и возвращает (version_line, version_str).
+    Результат кешируется по пути, mtime и размеру исполняемого файла.
+    OSError и subprocess.TimeoutExpired пробрасываются вызывающему.
+    """
+    st = os.stat(java_path)
+    cache_key = (os.path.abspath(java_path), st.st_mtime_ns, st.st_size)
+    with _java_version_lock:
+        cached = _JAVA_VERSION_CACHE.get(cache_key)
+    if cached:
+        return cached
+    result = subprocess.run(
+        [java_path, "-version"], capture_output=True, text=True, timeout=JAVA_PROBE_TIMEOUT_SECONDS,
+        creationflags=NO_WINDOW_FLAGS, startupinfo=get_hidden_startupinfo()
+    )
+    version_lines = (result.stderr or result.stdout or "").splitlines()
+    version_line = version_lines[0] if version_lines else ''
+    version_str = parse_java_version(version_line)
+    logger.info(f"Путь: {java_path}, java -version: {version_lines}, версия: {version_str}")
+    with _java_version_lock:
+        _JAVA_VERSION_CACHE[cache_key] = (version_line, version_str)
+    return version_line, version_str
@@ -0,0 +1,56 @@
+
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:  # orjson не установлен - используем стандартный json
+    orjson = None
+
+
+def loads(data):
+    """
+    Разбирает JSON из bytes или str.
+    Использует orjson, если он доступен, иначе стандартный модуль json.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """
+    Сериализует объект в JSON с отступом в 2 пробела и возвращает bytes,
+    готовые для записи в файл одним вызовом write().
+    Формат на диске одинаков с orjson и без него (orjson поддерживает только отступ 2).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def write_bytes_atomic(path, data):
+    """
+    Атомарно записывает data в path: сначала в уникальный временный файл в той же папке,
+    затем os.replace. Читатели видят либо старое, либо новое содержимое целиком.
+    OSError пробрасывается, временный файл при ошибке удаляется.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path, obj):
+    """Атомарно сохраняет obj в path в формате dumps()."""
+    write_bytes_atomic(path, dumps(obj))
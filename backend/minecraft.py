@@ -1,20 +1,32 @@
 
-import minecraft_launcher_lib as mll
 import logging
 import os
 import subprocess
-import re
 import sys
 import requests
+import urllib3
 import shutil
 import importlib
-import glob
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from .paths import get_authlib_path, get_game_dir
+from . import json_utils
+from .http_utils import create_session, cached_get
+from .java_utils import NO_WINDOW_FLAGS, get_java_version
+from .paths import get_authlib_path, get_game_dir, get_data_dir
 
 logger = logging.getLogger(__name__)
 
 AUTHLIB_API_URL = "https://api.github.com/repos/yushijinhun/authlib-injector/releases/latest"
+AUTHLIB_RELEASE_CACHE_TTL_SECONDS = 6 * 3600
+AUTHLIB_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+MINECRAFT_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+_IS_WIN = sys.platform == "win32"
+
+# Общая сессия: запрос к GitHub API и скачивание JAR идут по уже открытому TLS-соединению
+http_session = create_session(4, 8)
 
 def get_latest_authlib_url():
     """
@@ -23,9 +35,9 @@ def get_latest_authlib_url():
     """
     logger.info(f"Запрос последней версии authlib-injector с GitHub API: {AUTHLIB_API_URL}")
     try:
-        response = requests.get(AUTHLIB_API_URL, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        data = cached_get(http_session, AUTHLIB_API_URL, os.path.join(get_data_dir(), 'authlib_release.json'),
+                          ttl=AUTHLIB_RELEASE_CACHE_TTL_SECONDS,
+                          headers={"Accept": "application/vnd.github+json"}, stale_on_error=True)
         assets = data.get('assets', [])
 
         for asset in assets:
@@ -42,8 +54,63 @@ def get_latest_authlib_url():
         logger.error(f"Ошибка при запросе к GitHub API для authlib-injector: {e}")
         return None
 
+_authlib_download_lock = threading.Lock()
+
 def download_authlib_injector(authlib_path):
     """Скачивает authlib-injector.jar, если он отсутствует, используя динамическую ссылку."""
+    # Загрузка может ещё идти в фоне после прошлого prepare_environment - в один .part пишет только один поток
+    with _authlib_download_lock:
+        _download_authlib_injector(authlib_path)
+
+def _discard_part(part_path, part_meta_path):
+    for path in (part_path, part_meta_path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _get_resumable_part(part_path, part_meta_path, download_url):
+    """
+    Возвращает (размер, ETag) недокачанного .part, если он относится к тому же URL и его ETag известен.
+    Иначе .part удаляется: без валидатора нельзя проверить, что на сервере тот же файл.
+    """
+    try:
+        resume_from = os.path.getsize(part_path)
+        with open(part_meta_path, 'rb') as f:
+            meta = json_utils.loads(f.read())
+    except (OSError, ValueError):
+        meta = None
+        resume_from = 0
+    if resume_from and isinstance(meta, dict) and meta.get('url') == download_url and meta.get('etag'):
+        return resume_from, meta['etag']
+    _discard_part(part_path, part_meta_path)
+    return 0, None
+
+def _content_range_start(response):
+    """Начальный байт из Content-Range: bytes <начало>-<конец>/<размер>; None, если заголовок некорректен."""
+    byte_range = response.headers.get('Content-Range', '').removeprefix('bytes ').partition('/')[0]
+    try:
+        return int(byte_range.partition('-')[0])
+    except ValueError:
+        return None
+
+def _expected_part_size(response, resume_from):
+    """
+    Полный размер файла по заголовкам ответа: итог из Content-Range для 206, иначе Content-Length.
+    None, если размер неизвестен или тело пришло сжатым (тогда Content-Length не равен размеру файла).
+    """
+    if response.headers.get('Content-Encoding', 'identity') != 'identity':
+        return None
+    if response.status_code == 206:
+        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get('Content-Length', '')
+    if not length.isdigit():
+        return None
+    return int(length) + (resume_from if response.status_code == 206 else 0)
+
+def _download_authlib_injector(authlib_path):
     if not os.path.exists(authlib_path):
         logger.info("authlib-injector.jar не найден, скачиваю последнюю версию...")
         try:
@@ -53,36 +120,122 @@ def download_authlib_injector(authlib_path):
 
             logger.info(f"Использую URL: {download_url}")
             os.makedirs(os.path.dirname(authlib_path), exist_ok=True)
-            response = requests.get(download_url, stream=True, timeout=30, allow_redirects=True)
-            logger.info(f"Статус ответа: {response.status_code}")
-            response.raise_for_status()
-            
-            with open(authlib_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            part_path = authlib_path + ".part"
+            part_meta_path = part_path + ".json"
+            resume_from, etag = _get_resumable_part(part_path, part_meta_path, download_url)
+            # Недокачанный .part продолжаем с последнего байта (Range, RFC 7233);
+            # If-Range: если файл на сервере изменился, он придет целиком с ответом 200
+            # Без сжатия: смещения Range и Content-Length относятся к самому файлу
+            headers = {"Accept-Encoding": "identity"}
+            if resume_from:
+                headers.update({"Range": f"bytes={resume_from}-", "If-Range": etag})
+            with http_session.get(download_url, headers=headers, stream=True, timeout=30, allow_redirects=True) as response:
+                logger.info(f"Статус ответа: {response.status_code}")
+                if response.status_code == 416:
+                    # Часть не подходит к файлу на сервере - качаем заново
+                    _discard_part(part_path, part_meta_path)
+                    raise requests.exceptions.HTTPError(f"Сервер отклонил докачку с байта {resume_from}", response=response)
+                response.raise_for_status()
+                if response.status_code == 206 and (not resume_from or _content_range_start(response) != resume_from):
+                    _discard_part(part_path, part_meta_path)
+                    raise IOError(f"Сервер вернул неожиданный диапазон: {response.headers.get('Content-Range')}")
+                mode = 'ab' if resume_from and response.status_code == 206 else 'wb'
+                if resume_from:
+                    logger.info(f"Докачка authlib-injector с байта {resume_from}" if mode == 'ab' else "Файл на сервере изменился или докачка не поддерживается, скачиваю целиком.")
+                if mode == 'wb':
+                    json_utils.write_json_atomic(part_meta_path, {'url': download_url, 'etag': response.headers.get('ETag')})
+                expected_size = _expected_part_size(response, resume_from)
+                response.raw.decode_content = True
+                with open(part_path, mode) as f:
+                    shutil.copyfileobj(response.raw, f, length=AUTHLIB_DOWNLOAD_CHUNK_SIZE)
+            # Оборванное соединение может закончить поток без ошибки: .part оставляем для докачки
+            actual_size = os.path.getsize(part_path)
+            if expected_size is not None and actual_size != expected_size:
+                raise IOError(f"authlib-injector скачан не полностью: {actual_size} из {expected_size} байт")
+            os.replace(part_path, authlib_path)
+            _discard_part(part_path, part_meta_path)
             logger.info(f"authlib-injector.jar успешно скачан в {authlib_path}.")
 
-        except (requests.exceptions.RequestException, ValueError) as e:
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, ValueError, OSError) as e:
+            # Чтение response.raw бросает исключения urllib3 (ProtocolError, ReadTimeoutError) напрямую
             logger.error(f"Не удалось скачать authlib-injector: {e}")
             raise RuntimeError(f"Не удалось скачать authlib-injector: {e}") from e
 
+# Папки вендоров JDK; внутри каждой ищем подпапки jdk-*
+JAVA_SEARCH_PARENTS = [
+    r"%ProgramFiles%\Java",
+    r"%ProgramFiles%\Eclipse Adoptium",
+    r"%ProgramFiles%\Microsoft",
+    r"%ProgramFiles(x86)%\Java",
+]
+
+@functools.lru_cache(maxsize=1)
 def find_java_windows() -> str | None:
-    """Ищет javaw.exe в стандартных местах Windows."""
-    search_patterns = [
-        r"%ProgramFiles%\Java\jdk-*\bin\javaw.exe",
-        r"%ProgramFiles%\Eclipse Adoptium\jdk-*\bin\javaw.exe",
-        r"%ProgramFiles%\Microsoft\jdk-*\bin\javaw.exe",
-        r"%ProgramFiles(x86)%\Java\jdk-*\bin\javaw.exe",
-    ]
-    for pattern in search_patterns:
-        path = os.path.expandvars(pattern)
-        matches = glob.glob(path)
-        if matches:
-            return matches[0]
+    """Ищет javaw.exe в стандартных местах Windows, читая каждую папку вендора один раз."""
+    for parent in JAVA_SEARCH_PARENTS:
+        try:
+            with os.scandir(os.path.expandvars(parent)) as entries:
+                for entry in entries:
+                    if not entry.name.lower().startswith("jdk-") or not entry.is_dir():
+                        continue
+                    javaw = os.path.join(entry.path, "bin", "javaw.exe")
+                    if os.path.isfile(javaw):
+                        return javaw
+        except OSError:
+            continue
     return None
 
+_INSTALLED_MANIFEST = {'data': None}  # путь к папке версии -> True после успешной установки
+_installed_manifest_lock = threading.Lock()
+
+def _get_installed_manifest_path():
+    return os.path.join(get_data_dir(), 'installed.json')
+
+def _load_installed_manifest():
+    """Возвращает манифест установленных версий; с диска он читается один раз за процесс."""
+    with _installed_manifest_lock:
+        if _INSTALLED_MANIFEST['data'] is None:
+            try:
+                with open(_get_installed_manifest_path(), 'rb') as f:
+                    data = json_utils.loads(f.read())
+                _INSTALLED_MANIFEST['data'] = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                _INSTALLED_MANIFEST['data'] = {}
+        return _INSTALLED_MANIFEST['data']
+
+def _set_installed(version_path, installed):
+    """
+    Отмечает версию установленной (после успешной установки) или снимает отметку (перед установкой),
+    чтобы прерванная установка не считалась завершенной. Манифест сохраняется атомарно.
+    """
+    manifest = _load_installed_manifest()
+    with _installed_manifest_lock:
+        if bool(manifest.get(version_path)) == installed:
+            return
+        if installed:
+            manifest[version_path] = True
+        else:
+            manifest.pop(version_path, None)
+        try:
+            json_utils.write_json_atomic(_get_installed_manifest_path(), manifest)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить манифест установленных версий: {e}")
+
+def _is_version_installed(version_path):
+    """
+    Версия установлена, только если её установка завершилась успешно (есть запись в манифесте)
+    и папка версии на месте. Папка без записи - след прерванной установки, её доустанавливает
+    minecraft_launcher_lib, пропуская уже скачанные файлы.
+    """
+    return bool(_load_installed_manifest().get(version_path)) and os.path.isdir(version_path)
+
 class MinecraftRunner:
     """Отвечает за установку, настройку и запуск Minecraft."""
+    # Общий для всех экземпляров кеш поиска Java: кастомный путь -> найденный javaw.exe
+    # (версии кешируются в java_utils)
+    _java_path_cache = {}
+    _java_cache_lock = threading.Lock()
+
     def __init__(self, config, account_info=None, version=None, fabric_version=None, status_callback=None, progress_callback=None):
         self.config = config
         self.minecraft_directory = get_game_dir(config)
@@ -123,96 +276,100 @@ class MinecraftRunner:
         elif not text.lower().startswith("download "):
             self.status_callback(text)
 
+    @classmethod
+    def invalidate_java_cache(cls):
+        """Сбрасывает найденные пути Java (вызывается при изменении настроек)."""
+        with cls._java_cache_lock:
+            cls._java_path_cache.clear()
+        find_java_windows.cache_clear()
+
+    def _java_cache_key(self):
+        # PATH входит в ключ: системный javaw.exe ищется по нему
+        return (self.java_settings.get('path') or '', os.environ.get('PATH', ''))
+
     def _find_java(self):
-        """Ищет Java: сначала кастомный путь, потом системный, потом автопоиск."""
+        """Ищет Java, запоминая результат для текущего кастомного пути и PATH."""
+        cache_key = self._java_cache_key()
+        with self._java_cache_lock:
+            cached = self._java_path_cache.get(cache_key)
+        if cached and os.path.isfile(cached):
+            return cached
+        java_path = self._lookup_java()
+        if java_path:
+            with self._java_cache_lock:
+                self._java_path_cache[cache_key] = java_path
+        return java_path
+
+    def _java_candidates(self):
+        """Кандидаты Java по приоритету: кастомный путь, системный javaw, автопоиск. Вычисляются лениво."""
         custom_path = self.java_settings.get('path')
         if custom_path:
-            if os.path.isfile(custom_path) and custom_path.endswith("javaw.exe"):
-                return custom_path
-            javaw = os.path.join(custom_path, "bin", "javaw.exe")
-            if os.path.exists(javaw):
-                return javaw
+            if custom_path.endswith("javaw.exe"):
+                yield custom_path
+            yield os.path.join(custom_path, "bin", "javaw.exe")
+        yield shutil.which("javaw.exe")
+        yield find_java_windows()
 
-        system_java = shutil.which("javaw.exe")
-        if system_java:
-            return system_java
-
-        auto_java = find_java_windows()
-        if auto_java:
-            return auto_java
-
-        self._last_error = "Java не найдена. Установите Java 21+ или укажите путь в настройках."
-        return None
-        return None
+    def _lookup_java(self):
+        """Ищет Java: сначала кастомный путь, потом системный, потом автопоиск."""
+        java_path = next((path for path in self._java_candidates() if path and os.path.isfile(path)), None)
+        if java_path is None:
+            # Не запоминаем отсутствие Java, чтобы установленная позже нашлась без перезапуска
+            find_java_windows.cache_clear()
+            self._last_error = "Java не найдена. Установите Java 21+ или укажите путь в настройках."
+        return java_path
 
     def validate_ely_token(self):
         """Проверка валидности токена Ely.by"""
+        is_valid, error = self._check_ely_token()
+        if not is_valid:
+            self._last_error = error
+        return is_valid
+
+    def _check_ely_token(self):
+        """Проверяет токен Ely.by, не трогая _last_error. Возвращает (валиден, текст ошибки)."""
         if self.account_info.get("type") == "ely.by":
             token = self.account_info.get("accessToken")
             if token:
                 validate_url = "https://authserver.ely.by/auth/validate"
                 try:
                     self.status_callback("Проверка токена авторизации...")
-                    response = requests.post(validate_url, json={"accessToken": token}, timeout=10)
+                    response = http_session.post(validate_url, json={"accessToken": token}, timeout=10)
                     if response.status_code == 200:
                         logger.info("Токен Ely.by валиден")
-                        return True
+                        return True, None
                     else:
                         logger.warning(f"Токен Ely.by невалиден, статус: {response.status_code}, тело: {response.text}")
-                        self._last_error = "Токен авторизации истек. Необходимо войти в аккаунт заново."
-                        return False
+                        return False, "Токен авторизации истек. Необходимо войти в аккаунт заново."
                 except requests.exceptions.RequestException as e:
                     logger.error(f"Ошибка проверки токена Ely.by: {e}")
                     logger.info("Не удалось проверить токен из-за сетевой ошибки, продолжаем запуск")
-                    return True
+                    return True, None
             else:
-                self._last_error = "Отсутствует токен авторизации для аккаунта Ely.by"
-                return False
-        return True
+                return False, "Отсутствует токен авторизации для аккаунта Ely.by"
+        return True, None
 
     def _get_java_version_from_path(self, java_path):
         """Возвращает (major_version, full_version) или (None, ошибка)."""
-        try:
-            java_exe = java_path.replace("javaw.exe", "java.exe")
-            if not os.path.exists(java_exe):
-                java_exe = java_path
-
-            result = subprocess.run(
-                [java_exe, "-version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-
-            version_lines = (result.stderr or result.stdout or "").splitlines()
-            version_line = version_lines[0] if version_lines else ''
-            logger.info(f"Путь: {java_path}, java -version: {version_lines}")
-            # Новый парсер: ищем версию между кавычками, потом после openjdk/java, потом просто первую цифру
-            match = re.search(r'version\\s+\"([^\"]+)\"', version_line)
-            if match:
-                version_str = match.group(1)
-                logger.info(f"Парсер: найдено по кавычкам: {version_str}")
-            else:
-                match = re.search(r'(?:openjdk|java)[^\d]*(\d+(?:\.\d+)+)', version_line, re.IGNORECASE)
-                if match:
-                    version_str = match.group(1)
-                    logger.info(f"Парсер: найдено по openjdk/java: {version_str}")
-                else:
-                    match = re.search(r'(\d+)', version_line)
-                    version_str = match.group(1) if match else version_line.strip() or "?"
-                    logger.info(f"Парсер: найдено по первой цифре: {version_str}")
-            # major_version — первая часть до точки
-            try:
-                major = int(version_str.split('.')[0])
-            except Exception:
-                return None, f"Не удалось определить major-версию из: {version_str}"
-            return major, version_line.strip()
+        java_exe = java_path.replace("javaw.exe", "java.exe")
+        if not os.path.exists(java_exe):
+            java_exe = java_path
+        return self._run_java_version(java_exe)
 
+    def _run_java_version(self, java_exe):
+        """Запускает java -version (результат кешируется в java_utils) и возвращает (major_version, full_version)."""
+        try:
+            version_line, version_str = get_java_version(java_exe)
         except subprocess.TimeoutExpired:
             return None, "Таймаут при проверке Java"
         except Exception as e:
             return None, f"Ошибка при проверке версии: {str(e)}"
+        # major_version — первая часть до точки
+        try:
+            major = int(version_str.split('.')[0])
+        except ValueError:
+            return None, f"Не удалось определить major-версию из: {version_str}"
+        return major, version_line.strip()
 
     def check_java_version_only(self):
         java_path = self._find_java()
@@ -220,32 +377,62 @@ class MinecraftRunner:
             return False, self._last_error or "Java не найдена."
 
         major_version, full_version_str = self._get_java_version_from_path(java_path)
-        if major_version is None:
-            return False, full_version_str
-
-        if major_version < 21:
+        if major_version is None or major_version < 21:
+            # Неподходящую Java не запоминаем, чтобы после её обновления поиск прошел заново
+            with self._java_cache_lock:
+                self._java_path_cache.pop(self._java_cache_key(), None)
+            if major_version is None:
+                return False, full_version_str
             return False, f"Требуется Java 21+. Найдена версия {full_version_str}."
 
         self._java_path = java_path
         return True, f"Java {full_version_str} (≥ 21) найдена."
 
     def prepare_environment(self):
-        """Проверяет наличие Java и валидность токена. Возвращает True в случае успеха, False если есть проблемы."""
+        """
+        Проверяет наличие Java и валидность токена и скачивает authlib-injector.
+        Все три операции независимы и выполняются параллельно.
+        Возвращает True в случае успеха, False если есть проблемы.
+        """
         logger.info("--- Начало подготовки окружения ---")
-        
-        if self.account_info and not self.validate_ely_token():
-            self.status_callback(f"Ошибка: {self._last_error}")
-            logger.error(self._last_error)
-            return False
-        
+
         self.status_callback("Проверка среды Java...")
-        is_valid, message = self.check_java_version_only()
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="mc-prepare")
+        try:
+            # Запрос к Ely.by и запросы к GitHub (ссылка на релиз + сам JAR) идут через общие сессии одновременно
+            token_future = executor.submit(self._check_ely_token) if self.account_info else None
+            java_future = executor.submit(self.check_java_version_only)
+            authlib_future = executor.submit(download_authlib_injector, self.authlib_path) if not os.path.exists(self.authlib_path) else None
+            return self._collect_prepare_results(token_future, java_future, authlib_future)
+        finally:
+            # При первой же ошибке отвечаем сразу; оставшиеся задачи (например, докачка JAR) завершатся в фоне
+            executor.shutdown(wait=False)
+
+    def _collect_prepare_results(self, token_future, java_future, authlib_future):
+        """Разбирает результаты prepare_environment; ошибки сообщаются в порядке: токен, Java, authlib-injector."""
+        if token_future:
+            is_token_valid, token_error = token_future.result()
+            if not is_token_valid:
+                self._last_error = token_error
+                self.status_callback(f"Ошибка: {self._last_error}")
+                logger.error(self._last_error)
+                return False
 
+        is_valid, message = java_future.result()
         if not is_valid:
             self._last_error = message
             self.status_callback(f"Ошибка: {self._last_error}")
             return False
-            
+
+        if authlib_future:
+            try:
+                authlib_future.result()
+            except Exception as e:
+                self._last_error = f"Ошибка загрузки authlib-injector: {e}"
+                self.status_callback(self._last_error)
+                logger.error(self._last_error)
+                return False
+
         logger.info(f"Используется Java по пути: {self._java_path}")
         return True
 
@@ -257,31 +444,29 @@ class MinecraftRunner:
             raise RuntimeError("Путь к игре не определен. Невозможно установить зависимости.")
 
         callback = {"setStatus": self._status_handler, "setProgress": self.progress_callback}
-        
-        try:
-            download_authlib_injector(self.authlib_path)
-        except Exception as e:
-            self._last_error = f"Ошибка загрузки authlib-injector: {e}"
-            self.status_callback(self._last_error)
-            raise RuntimeError("Не удалось подготовить среду для запуска Ely.by") from e
+        # authlib-injector скачивается в prepare_environment() вместе с проверкой Java
 
         if self.version:
             vanilla_version_path = os.path.join(self.minecraft_directory, "versions", self.version)
-            is_installed = os.path.isdir(vanilla_version_path)
+            is_installed = _is_version_installed(vanilla_version_path)
 
             if is_installed:
                 logger.info(f"Minecraft {self.version} уже установлен, пропуск установки.")
                 self.status_callback(f"Minecraft {self.version} уже установлен")
             else:
                 logger.info(f"Установка Minecraft {self.version}...")
+                # minecraft_launcher_lib тяжелый при импорте: загружаем его, только если версия не установлена
+                import minecraft_launcher_lib as mll
+                _set_installed(vanilla_version_path, False)
                 mll.install.install_minecraft_version(self.version, self.minecraft_directory, callback=callback)
+                _set_installed(vanilla_version_path, True)
         else:
             raise ValueError("Версия Minecraft не указана, установка невозможна.")
 
         if self.fabric_version:
             fabric_version_id = f"fabric-loader-{self.fabric_version}-{self.version}"
             fabric_version_path = os.path.join(self.minecraft_directory, "versions", fabric_version_id)
-            is_fabric_installed = os.path.isdir(fabric_version_path)
+            is_fabric_installed = _is_version_installed(fabric_version_path)
 
             if is_fabric_installed:
                 logger.info(f"Fabric Loader {self.fabric_version} уже установлен, пропуск установки.")
@@ -296,7 +481,10 @@ class MinecraftRunner:
                     os.environ['PATH'] = f"{java_bin_dir}{os.pathsep}{original_path}"
                     logger.info(f"Временно добавлен '{java_bin_dir}' в PATH для установщика Fabric.")
                     
+                    import minecraft_launcher_lib as mll
+                    _set_installed(fabric_version_path, False)
                     mll.fabric.install_fabric(self.version, self.minecraft_directory, self.fabric_version, callback=callback)
+                    _set_installed(fabric_version_path, True)
 
                 except Exception as e:
                     logger.error(f"Ошибка во время установки Fabric: {e}", exc_info=True)
@@ -352,10 +540,11 @@ class MinecraftRunner:
         options["jvmArguments"] = jvm_arguments
         logger.info(f"Запуск версии: {version_id}")
 
+        import minecraft_launcher_lib as mll
         try:
             minecraft_command = mll.command.get_minecraft_command(version_id, self.minecraft_directory, options)
             
-            if sys.platform == "win32" and minecraft_command[0].endswith("java.exe"):
+            if _IS_WIN and minecraft_command[0].endswith("java.exe"):
                  javaw_path = os.path.join(os.path.dirname(minecraft_command[0]), "javaw.exe")
                  if os.path.exists(javaw_path):
                      logger.info("Переключение на javaw.exe для скрытия консоли.")
@@ -376,14 +565,22 @@ class MinecraftRunner:
             logs_dir = get_logs_dir()
             os.makedirs(logs_dir, exist_ok=True)
             mc_log_path = os.path.join(logs_dir, "minecraft.log")
-            mc_log_file = open(mc_log_path, "a", encoding="utf-8")
-            return subprocess.Popen(
-                minecraft_command,
-                creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0,
-                stdout=mc_log_file,
-                stderr=subprocess.STDOUT,
-                cwd=self.minecraft_directory
-            )
+            # Не даём логу расти бесконечно: большой файл уходит в minecraft.log.1
+            try:
+                if os.path.getsize(mc_log_path) > MINECRAFT_LOG_MAX_BYTES:
+                    os.replace(mc_log_path, mc_log_path + ".1")
+            except OSError:
+                pass
+            # Игра пишет в унаследованный дескриптор напрямую, поэтому файл открываем в бинарном режиме
+            # и закрываем у себя сразу после запуска процесса
+            with open(mc_log_path, "ab") as mc_log_file:
+                return subprocess.Popen(
+                    minecraft_command,
+                    creationflags=NO_WINDOW_FLAGS,
+                    stdout=mc_log_file,
+                    stderr=subprocess.STDOUT,
+                    cwd=self.minecraft_directory
+                )
         except Exception as e:
             self._last_error = f"Ошибка запуска: {e}"
             self.status_callback(self._last_error)
@@ -1,12 +1,26 @@
 
 import os
 import json
+import errno
 import shutil
 import logging
+import threading
 from .paths import get_mods_dir, get_disabled_mods_dir, get_managed_mods_path
 
 logger = logging.getLogger(__name__)
 
+# (путь, mtime_ns) -> разобранный managed_mods.json; список общий для всех ModManager, только для чтения
+_MANAGED_CACHE = {}
+
+def _move_file(src, dst):
+    """Перемещает файл одним rename; копирование через shutil.move - только между разными дисками."""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
 class ModManager:
     """Управляет модами на основе конфигурационного файла: сканирует, включает и отключает их."""
     def __init__(self, config):
@@ -15,14 +29,26 @@ class ModManager:
         self.mods_dir = get_mods_dir(config)
         self.disabled_mods_dir = get_disabled_mods_dir(config)
         self.managed_mods = self._load_managed_mods_config()
+        # (mtime mods, mtime mods_disabled) и снимок имён файлов в этих папках.
+        # Экземпляр общий для потоков сервера, поэтому снимок читается и заменяется под блокировкой
+        self._snapshot_key = None
+        self._snapshot = None
+        self._lock = threading.RLock()
 
     def _load_managed_mods_config(self):
         """Загружает конфигурацию управляемых модов из JSON-файла."""
         config_path = get_managed_mods_path()
         try:
+            cache_key = (config_path, os.stat(config_path).st_mtime_ns)
+            cached = _MANAGED_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
             with open(config_path, 'r', encoding='utf-8') as f:
                 logger.info(f"Загрузка конфигурации управляемых модов из {config_path}")
-                return json.load(f)
+                managed_mods = json.load(f)
+            _MANAGED_CACHE.clear()
+            _MANAGED_CACHE[cache_key] = managed_mods
+            return managed_mods
         except FileNotFoundError:
             logger.warning(f"Файл конфигурации модов не найден: {config_path}. Список модов будет пуст.")
             return []
@@ -33,6 +59,51 @@ class ModManager:
             logger.error(f"Неожиданная ошибка при загрузке конфигурации модов: {e}")
             return []
 
+    @staticmethod
+    def _dir_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+
+    @staticmethod
+    def _scan_dir(path, label):
+        """Возвращает множество имён файлов в папке (пустое, если папки нет)."""
+        if not path:
+            return frozenset()
+        try:
+            with os.scandir(path) as entries:
+                return frozenset(entry.name for entry in entries)
+        except FileNotFoundError:
+            return frozenset()
+        except OSError as e:
+            logger.error(f"Не удалось прочитать папку {label}: {e}")
+            return frozenset()
+
+    def _snapshot_dirs(self):
+        """
+        Возвращает (enabled_set, disabled_set) - имена файлов в mods и mods_disabled.
+        Папки перечитываются только если изменилось их mtime, поэтому экземпляр можно переиспользовать.
+        """
+        with self._lock:
+            key = (self._dir_mtime(self.mods_dir), self._dir_mtime(self.disabled_mods_dir))
+            if self._snapshot is None or self._snapshot_key != key:
+                self._snapshot = (self._scan_dir(self.mods_dir, 'mods'), self._scan_dir(self.disabled_mods_dir, 'mods_disabled'))
+                self._snapshot_key = key
+            return self._snapshot
+
+    def refresh(self):
+        """Принудительно перечитывает содержимое папок модов."""
+        with self._lock:
+            self._snapshot = None
+            return self._snapshot_dirs()
+
+    def _describe_dirs(self, enabled_files, disabled_files):
+        return (
+            f"Содержимое mods: {sorted(enabled_files) if os.path.exists(self.mods_dir) else 'Папка не найдена'}\n"
+            f"Содержимое mods_disabled: {sorted(disabled_files) if os.path.exists(self.disabled_mods_dir) else 'Папка не найдена'}"
+        )
+
     def get_all_mods(self):
         """
         Возвращает информацию только о тех модах, которые указаны в managed_mods.json.
@@ -49,20 +120,7 @@ class ModManager:
             return []
 
         # Получаем списки файлов из папок
-        enabled_files = set()
-        if os.path.exists(self.mods_dir):
-            try:
-                enabled_files = set(os.listdir(self.mods_dir))
-            except OSError as e:
-                logger.error(f"Не удалось прочитать папку mods: {e}")
-
-
-        disabled_files = set()
-        if os.path.exists(self.disabled_mods_dir):
-            try:
-                disabled_files = set(os.listdir(self.disabled_mods_dir))
-            except OSError as e:
-                logger.error(f"Не удалось прочитать папку mods_disabled: {e}")
+        enabled_files, disabled_files = self._snapshot_dirs()
 
         result_mods = []
         for mod_info in self.managed_mods:
@@ -92,6 +150,11 @@ class ModManager:
 
     def set_mod_state(self, mod_filename, enable):
         """Включает или отключает мод, перемещая его файл. Теперь логирует каждую ситуацию явно."""
+        # Проверка снимка, перемещение файла и обновление снимка - одна операция для параллельных запросов
+        with self._lock:
+            return self._set_mod_state(mod_filename, enable)
+
+    def _set_mod_state(self, mod_filename, enable):
         logger.info(f"[ModManager] set_mod_state вызван: filename='{mod_filename}', enable={enable}")
         if not self.mods_dir or not self.disabled_mods_dir:
             logger.error("Game directory not set, cannot change mod state.")
@@ -105,8 +168,9 @@ class ModManager:
         enabled_path = os.path.join(self.mods_dir, mod_filename)
         disabled_path = os.path.join(self.disabled_mods_dir, mod_filename)
 
-        enabled_exists = os.path.exists(enabled_path)
-        disabled_exists = os.path.exists(disabled_path)
+        enabled_files, disabled_files = self._snapshot_dirs()
+        enabled_exists = mod_filename in enabled_files
+        disabled_exists = mod_filename in disabled_files
 
         if enable:
             if enabled_exists:
@@ -115,24 +179,24 @@ class ModManager:
             elif disabled_exists:
                 try:
                     os.makedirs(self.mods_dir, exist_ok=True)
-                    shutil.move(disabled_path, enabled_path)
+                    _move_file(disabled_path, enabled_path)
+                    self._record_move(mod_filename, enabled=True)
                     logger.info(f"Мод '{mod_filename}' был успешно включён (перемещён из mods_disabled в mods).")
                     return True
                 except Exception as e:
+                    enabled_files, disabled_files = self.refresh()
                     logger.error(
                         f"Ошибка перемещения файла '{mod_filename}' при включении: {e}\n"
                         f"Исходный путь: {disabled_path}\n"
                         f"Папка назначения: {enabled_path}\n"
-                        f"Содержимое mods: {os.listdir(self.mods_dir) if os.path.exists(self.mods_dir) else 'Папка не найдена'}\n"
-                        f"Содержимое mods_disabled: {os.listdir(self.disabled_mods_dir) if os.path.exists(self.disabled_mods_dir) else 'Папка не найдена'}"
+                        f"{self._describe_dirs(enabled_files, disabled_files)}"
                     )
                     return False
             else:
                 logger.error(
                     f"Не удалось включить мод '{mod_filename}': файл не найден ни в mods, ни в mods_disabled!\n"
                     f"Ожидалось: {disabled_path} -> {enabled_path}\n"
-                    f"Содержимое mods: {os.listdir(self.mods_dir) if os.path.exists(self.mods_dir) else 'Папка не найдена'}\n"
-                    f"Содержимое mods_disabled: {os.listdir(self.disabled_mods_dir) if os.path.exists(self.disabled_mods_dir) else 'Папка не найдена'}"
+                    f"{self._describe_dirs(enabled_files, disabled_files)}"
                 )
                 return False
         else:
@@ -142,23 +206,36 @@ class ModManager:
             elif enabled_exists:
                 try:
                     os.makedirs(self.disabled_mods_dir, exist_ok=True)
-                    shutil.move(enabled_path, disabled_path)
+                    _move_file(enabled_path, disabled_path)
+                    self._record_move(mod_filename, enabled=False)
                     logger.info(f"Мод '{mod_filename}' был успешно выключен (перемещён из mods в mods_disabled).")
                     return True
                 except Exception as e:
+                    enabled_files, disabled_files = self.refresh()
                     logger.error(
                         f"Ошибка перемещения файла '{mod_filename}' при выключении: {e}\n"
                         f"Исходный путь: {enabled_path}\n"
                         f"Папка назначения: {disabled_path}\n"
-                        f"Содержимое mods: {os.listdir(self.mods_dir) if os.path.exists(self.mods_dir) else 'Папка не найдена'}\n"
-                        f"Содержимое mods_disabled: {os.listdir(self.disabled_mods_dir) if os.path.exists(self.disabled_mods_dir) else 'Папка не найдена'}"
+                        f"{self._describe_dirs(enabled_files, disabled_files)}"
                     )
                     return False
             else:
                 logger.error(
                     f"Не удалось выключить мод '{mod_filename}': файл не найден ни в mods, ни в mods_disabled!\n"
                     f"Ожидалось: {enabled_path} -> {disabled_path}\n"
-                    f"Содержимое mods: {os.listdir(self.mods_dir) if os.path.exists(self.mods_dir) else 'Папка не найдена'}\n"
-                    f"Содержимое mods_disabled: {os.listdir(self.disabled_mods_dir) if os.path.exists(self.disabled_mods_dir) else 'Папка не найдена'}"
+                    f"{self._describe_dirs(enabled_files, disabled_files)}"
                 )
                 return False
+
+    def _record_move(self, mod_filename, enabled):
+        """Обновляет снимок папок после перемещения мода, не перечитывая их. Вызывается под self._lock."""
+        with self._lock:
+            if self._snapshot is None:
+                return
+            enabled_files, disabled_files = self._snapshot
+            if enabled:
+                enabled_files, disabled_files = enabled_files | {mod_filename}, disabled_files - {mod_filename}
+            else:
+                enabled_files, disabled_files = enabled_files - {mod_filename}, disabled_files | {mod_filename}
+            self._snapshot = (enabled_files, disabled_files)
+            self._snapshot_key = (self._dir_mtime(self.mods_dir), self._dir_mtime(self.disabled_mods_dir))
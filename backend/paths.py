@@ -1,7 +1,9 @@
 
 import os
 import sys
+import functools
 
+@functools.lru_cache(maxsize=1)
 def get_launcher_root_dir():
     """
     Возвращает корневую директорию лаунчера.
@@ -14,6 +16,7 @@ def get_launcher_root_dir():
         # В режиме разработки
         return os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
+@functools.lru_cache(maxsize=1)
 def get_data_dir():
     """
     Возвращает путь к папке .kristory внутри директории лаунчера.
@@ -31,18 +34,21 @@ def get_game_dir(config):
         return config.get('game_settings', {}).get('game_directory') or None
     return None
 
+@functools.lru_cache(maxsize=1)
 def get_config_path():
     """
     Возвращает абсолютный путь к файлу конфигурации launcher_config.json.
     """
     return os.path.join(get_data_dir(), 'launcher_config.json')
 
+@functools.lru_cache(maxsize=1)
 def get_logs_dir():
     """
     Всегда возвращает путь к папке logs в папке данных лаунчера.
     """
     return os.path.join(get_data_dir(), 'logs')
 
+@functools.lru_cache(maxsize=1)
 def get_renders_dir():
     """
     Всегда возвращает путь к папке renders в папке данных лаунчера.
@@ -63,12 +69,14 @@ def get_disabled_mods_dir(config):
     game_dir = get_game_dir(config)
     return os.path.join(game_dir, 'mods_disabled') if game_dir else None
 
+@functools.lru_cache(maxsize=1)
 def get_authlib_path():
     """
     Возвращает путь к файлу authlib-injector.jar внутри папки данных лаунчера.
     """
     return os.path.join(get_data_dir(), 'authlib-injector.jar')
 
+@functools.lru_cache(maxsize=1)
 def get_managed_mods_path():
     """
     Получает путь к файлу managed_mods.json, работая как в режиме разработки,
@@ -82,6 +90,7 @@ def get_managed_mods_path():
         # Режим разработки: файл лежит в той же папке, что и этот скрипт (backend).
         return os.path.join(os.path.dirname(__file__), 'managed_mods.json')
 
+@functools.lru_cache(maxsize=1)
 def get_initial_config_path():
     """
     Возвращает путь к launcher_config.json (для первого запуска).
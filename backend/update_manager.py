@@ -3,14 +3,43 @@ import requests
 import logging
 import os
 import zipfile
-import json
 import shutil
 import hashlib
-from .paths import get_game_dir
+import mmap
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from . import json_utils
+from .http_utils import create_session, cached_get
+from .paths import get_game_dir, get_data_dir, get_mods_dir
 
 logger = logging.getLogger(__name__)
 
 GITHUB_API_URL = "https://api.github.com/repos/rulled/kristory/releases/latest"
+# Проверять .mrpack целиком по .sha512 из релиза. Файлы внутри сборки и так сверяются по хешам
+# из modrinth.index.json, а хеш самого .mrpack считается на лету при скачивании, поэтому проверка
+# стоит лишь одного маленького запроса; выключать её имеет смысл только если sidecar-файлы не публикуются.
+VERIFY_OUTER_MRPACK = True
+UPDATE_CHECK_TTL_SECONDS = 60
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+HASH_BLOCK_SIZE = 1024 * 1024  # 1 MiB
+OVERRIDE_FOLDERS = ('overrides', 'client-overrides')
+OVERRIDE_PREFIXES = tuple(folder + '/' for folder in OVERRIDE_FOLDERS)
+PROGRESS_CALLBACK_INTERVAL = 0.016  # не чаще ~60 раз в секунду
+MMAP_HASH_MAX_BYTES = 128 * 1024 * 1024  # больше - не отображаем в память целиком (32-битные сборки)
+DOWNLOAD_WORKERS = 8
+PARALLEL_DOWNLOAD_MIN_FILES = 4
+HASH_CACHE_FILENAME = ".hash_cache.json"
+# Метаданные скачанного файла (Last-Modified, размер, mtime) хранятся рядом с ним
+DOWNLOAD_META_SUFFIX = ".meta.json"
+# Снимок индекса последней установки для инкрементальных обновлений, хранится рядом с .modpack_version
+INDEX_SNAPSHOT_FILENAME = ".modpack_index.json"
+
+# Одна сессия на все запросы: при установке сотен модов TLS-рукопожатие не повторяется для каждого файла
+http_session = create_session(16, 32, backoff_factor=0.5)
+
+# Последний успешный ответ GitHub, чтобы повторные нажатия "Играть" не ходили в сеть
+_UPDATE_CACHE = {'at': 0.0, 'info': None}
 
 def get_local_version(config):
     """Получает локальную версию сборки из папки ИГРЫ."""
@@ -25,14 +54,20 @@ def get_local_version(config):
             logger.error(f"Ошибка чтения локальной версии: {e}")
     return None
 
-def save_local_version(config, version):
-    """Сохраняет локальную версию сборки в папку ИГРЫ."""
-    game_dir = get_game_dir(config)
+def save_local_version(config, version, game_dir=None):
+    """Сохраняет локальную версию сборки в папку ИГРЫ (game_dir можно передать, если он уже известен)."""
+    game_dir = game_dir or get_game_dir(config)
     if not game_dir: return
     version_file = os.path.join(game_dir, ".modpack_version")
     try:
-        with open(version_file, 'w') as f:
-            f.write(version)
+        with open(version_file, 'r') as f:
+            if f.read().strip() == version:
+                return
+    except OSError:
+        pass
+    # Пишем через временный файл: обрезанный при сбое .modpack_version выглядел бы как первая установка
+    try:
+        json_utils.write_bytes_atomic(version_file, version.encode('utf-8'))
         logger.info(f"Сохранена версия сборки: {version}")
     except Exception as e:
         logger.error(f"Ошибка сохранения версии: {e}")
@@ -48,51 +83,38 @@ def check_incremental_update(local_version, remote_version):
     
     return "none"  # Обновление не нужно
 
+def invalidate_update_cache():
+    """Сбрасывает закешированный ответ GitHub, следующая проверка пойдет в сеть."""
+    _UPDATE_CACHE.update(at=0.0, info=None)
+
 def check_github_for_updates():
     """
     Проверяет последний релиз на GitHub и возвращает информацию о нем.
+    Успешный ответ кешируется на UPDATE_CHECK_TTL_SECONDS секунд.
     Возвращает словарь {'tag': 'v1.0', 'url': '...', 'filename': '...'} или None в случае ошибки.
     """
-    logger.info(f"Проверка обновлений по адресу: {GITHUB_API_URL}")
-    try:
-        response = requests.get(GITHUB_API_URL, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        tag_name = data.get('tag_name')
-        assets = data.get('assets', [])
-        
-        if not tag_name or not assets:
-            logger.warning("В последнем релизе отсутствуют тег или файлы (assets).")
-            return None
-            
-        mrpack_asset = next((asset for asset in assets if asset.get('name', '').endswith('.mrpack')), None)
-        if not mrpack_asset:
-            logger.warning("В последнем релизе не найден .mrpack файл.")
-            return None
-        
-        # Пытаемся найти хеш-файл для нашего mrpack
-        hash_asset_name = mrpack_asset.get('name') + '.sha512'
-        hash_asset = next((asset for asset in assets if asset.get('name') == hash_asset_name), None)
-        
-        sha512_hash = None
-        if hash_asset:
-            try:
-                hash_url = hash_asset.get('browser_download_url')
-                hash_response = requests.get(hash_url, timeout=10)
-                hash_response.raise_for_status()
-                sha512_hash = hash_response.text.split()[0].strip()
-                logger.info(f"Найден SHA512 хеш для {mrpack_asset.get('name')}: {sha512_hash}")
-            except Exception as e:
-                logger.warning(f"Не удалось скачать или прочитать файл хеша {hash_asset_name}: {e}")
+    cached_info = _UPDATE_CACHE['info']
+    if cached_info and time.monotonic() - _UPDATE_CACHE['at'] < UPDATE_CHECK_TTL_SECONDS:
+        logger.debug(f"Использую закешированную информацию о релизе: {cached_info['tag']}")
+        return dict(cached_info)
+    info = _fetch_latest_release()
+    if info:
+        _UPDATE_CACHE.update(at=time.monotonic(), info=info)
+        return dict(info)
+    return None
 
-        return {
-            'tag': tag_name,
-            'url': mrpack_asset.get('browser_download_url'),
-            'filename': mrpack_asset.get('name'),
-            'sha512': sha512_hash
-        }
+def _get_release_cache_path():
+    return os.path.join(get_data_dir(), 'etag_cache.json')
 
+def _fetch_latest_release():
+    """
+    Запрашивает последний релиз у GitHub API.
+    Запрос условный (If-None-Match/If-Modified-Since): на 304 возвращается сохраненный результат,
+    такой ответ пустой и не расходует лимит запросов GitHub.
+    """
+    logger.info(f"Проверка обновлений по адресу: {GITHUB_API_URL}")
+    try:
+        return cached_get(http_session, GITHUB_API_URL, _get_release_cache_path(), parse=_parse_latest_release)
     except requests.exceptions.RequestException as e:
         logger.error(f"Ошибка при запросе к GitHub API: {e}")
         return None
@@ -100,87 +122,256 @@ def check_github_for_updates():
         logger.error(f"Неожиданная ошибка при проверке обновлений: {e}", exc_info=True)
         return None
 
-def download_file(url, destination_folder, filename, expected_hash=None, progress_callback=None):
-    """
-    Скачивает файл по URL в указанную папку с проверкой хеша.
-    Скачивание происходит во временный файл, который переименовывается после успешной загрузки.
-    """
-    logger.info(f"Скачивание файла {filename} из {url}")
-    os.makedirs(destination_folder, exist_ok=True) # Ensure destination exists
-    final_filepath = os.path.join(destination_folder, filename)
-    temp_filepath = final_filepath + ".tmp"
+def _parse_latest_release(response):
+    """Извлекает из ответа GitHub тег, ссылку на .mrpack и его SHA512; возвращает (info, можно_ли_кешировать)."""
+    data = response.json()
+
+    tag_name = data.get('tag_name')
+    assets = data.get('assets', [])
     
+    if not tag_name or not assets:
+        logger.warning("В последнем релизе отсутствуют тег или файлы (assets).")
+        return None, False
+        
+    mrpack_asset = next((asset for asset in assets if asset.get('name', '').endswith('.mrpack')), None)
+    if not mrpack_asset:
+        logger.warning("В последнем релизе не найден .mrpack файл.")
+        return None, False
+    
+    # Пытаемся найти хеш-файл для нашего mrpack
+    hash_asset_name = mrpack_asset.get('name') + '.sha512'
+    hash_asset = next((asset for asset in assets if asset.get('name') == hash_asset_name), None)
+    
+    sha512_hash = None
+    if hash_asset and VERIFY_OUTER_MRPACK:
+        try:
+            hash_url = hash_asset.get('browser_download_url')
+            # Файл крошечный: без сжатия и без определения кодировки, хеш всегда в ASCII
+            hash_response = http_session.get(hash_url, timeout=10, headers={'Accept-Encoding': 'identity'})
+            hash_response.raise_for_status()
+            sha512_hash = hash_response.content.split(None, 1)[0].decode('ascii')
+            logger.info(f"Найден SHA512 хеш для {mrpack_asset.get('name')}: {sha512_hash}")
+        except Exception as e:
+            logger.warning(f"Не удалось скачать или прочитать файл хеша {hash_asset_name}: {e}")
+
+    info = {
+        'tag': tag_name,
+        'url': mrpack_asset.get('browser_download_url'),
+        'filename': mrpack_asset.get('name'),
+        'sha512': sha512_hash
+    }
+    # Без хеша не кешируем: иначе 304 навсегда закрепит релиз без проверки целостности
+    return info, bool(sha512_hash or not hash_asset or not VERIFY_OUTER_MRPACK)
+
+def _preallocate(f, size):
+    """Резервирует место под файл заранее, чтобы ФС не наращивала его по кускам."""
     try:
-        response = requests.get(url, stream=True, timeout=60)
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            f.truncate(size)
+    except OSError as e:
+        logger.debug(f"Не удалось зарезервировать место под файл: {e}")
+
+def _download_raw(url, temp_filepath, filename, compute_hash=False, progress_callback=None, response_headers=None):
+    """
+    Сетевая часть загрузки: пишет ответ во временный файл, считая SHA512 на лету.
+    Возвращает hex-хеш (или None, если он не нужен). Заголовки ответа копируются в response_headers, если он передан.
+    """
+    with http_session.get(url, stream=True, timeout=60) as response:
         response.raise_for_status()
+        if response_headers is not None:
+            response_headers.update(response.headers)
         
         total_size = int(response.headers.get('content-length', 0))
+        # Content-Length сжатого ответа не равен размеру распакованного файла - тогда не резервируем место
+        preallocate = total_size > 0 and not response.headers.get('content-encoding')
         
+        # Хеш считается прямо во время записи, чтобы не перечитывать файл с диска после скачивания
+        sha512 = hashlib.sha512() if compute_hash else None
         with open(temp_filepath, 'wb') as f:
+            if preallocate:
+                _preallocate(f, total_size)
             downloaded = 0
-            for chunk in response.iter_content(chunk_size=8192):
+            last_progress_at = 0.0
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 f.write(chunk)
+                if sha512:
+                    sha512.update(chunk)
                 downloaded += len(chunk)
                 if progress_callback and total_size > 0:
-                    progress = (downloaded / total_size)
-                    progress_callback(progress)
-        
-        logger.info(f"Файл {filename} скачан, проверка целостности...")
-        
-        if expected_hash:
-            local_hash = _get_sha512(temp_filepath)
-            if local_hash.lower() != expected_hash.lower():
-                raise ValueError(f"Хеш-сумма файла {filename} не совпадает. Ожидался: {expected_hash}, получен: {local_hash}")
-            logger.info("Хеш-сумма файла подтверждена.")
-
-        shutil.move(temp_filepath, final_filepath)
-        logger.info(f"Файл {filename} успешно сохранен в {destination_folder}")
+                    now = time.monotonic()
+                    if now - last_progress_at >= PROGRESS_CALLBACK_INTERVAL or downloaded >= total_size:
+                        last_progress_at = now
+                        progress_callback(downloaded / total_size)
+            if preallocate and downloaded != total_size:
+                # Обрыв соединения не должен оставить хвост из нулей зарезервированного места
+                raise IOError(f"Файл {filename} скачан не полностью: {downloaded} из {total_size} байт")
+    return sha512.hexdigest() if sha512 else None
+
+def _finalize_download(temp_filepath, final_filepath, filename, expected_hash, local_hash):
+    """Сверяет хеш скачанного файла и атомарно переносит его на место."""
+    logger.info(f"Файл {filename} скачан, проверка целостности...")
+    if expected_hash:
+        if local_hash.lower() != expected_hash.lower():
+            raise ValueError(f"Хеш-сумма файла {filename} не совпадает. Ожидался: {expected_hash}, получен: {local_hash}")
+        logger.info("Хеш-сумма файла подтверждена.")
+    os.replace(temp_filepath, final_filepath)
+    logger.info(f"Файл {filename} успешно сохранен в {os.path.dirname(final_filepath)}")
+
+def _discard_temp_file(temp_filepath):
+    # Удаляем временный файл в случае ошибки
+    if os.path.exists(temp_filepath):
+        try:
+            os.remove(temp_filepath)
+        except OSError:
+            pass
+
+def _link_or_copy(source, destination):
+    """Создает копию файла: жесткой ссылкой, если ФС позволяет, иначе обычным копированием."""
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    temp_filepath = destination + ".tmp"
+    _discard_temp_file(temp_filepath)
+    try:
+        os.link(source, temp_filepath)
+    except OSError:
+        shutil.copy2(source, temp_filepath)
+    os.replace(temp_filepath, destination)
+
+def _link_tree(src_dir, dst_dir):
+    """
+    Переносит содержимое src_dir в dst_dir поверх существующих файлов.
+    Временная папка распаковки лежит в той же ФС, поэтому файлы связываются жесткими ссылками без копирования данных.
+    """
+    for root, _, filenames in os.walk(src_dir):
+        target_root = os.path.join(dst_dir, os.path.relpath(root, src_dir))
+        os.makedirs(target_root, exist_ok=True)
+        for filename in filenames:
+            _link_or_copy(os.path.join(root, filename), os.path.join(target_root, filename))
+
+def _get_download_meta_path(final_filepath):
+    return final_filepath + DOWNLOAD_META_SUFFIX
+
+def _save_download_meta(final_filepath, url, last_modified):
+    """Запоминает Last-Modified и размер/mtime проверенного файла для условного запроса при следующей загрузке."""
+    meta_path = _get_download_meta_path(final_filepath)
+    if not last_modified:
+        _discard_temp_file(meta_path)
+        return
+    try:
+        st = os.stat(final_filepath)
+        with open(meta_path, 'wb') as f:
+            f.write(json_utils.dumps({
+                'url': url,
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'last_modified': last_modified,
+            }))
+    except OSError as e:
+        logger.debug(f"Не удалось сохранить метаданные загрузки {final_filepath}: {e}")
+
+def _is_download_unchanged(url, final_filepath):
+    """
+    Проверяет, что уже скачанный файл не изменился ни локально (размер и mtime из метаданных),
+    ни на сервере (HEAD с If-Modified-Since вернул 304).
+    """
+    try:
+        with open(_get_download_meta_path(final_filepath), 'rb') as f:
+            meta = json_utils.loads(f.read())
+        st = os.stat(final_filepath)
+    except (OSError, ValueError):
+        return False
+    if (not isinstance(meta, dict) or meta.get('url') != url or not meta.get('last_modified')
+            or meta.get('size') != st.st_size or meta.get('mtime_ns') != st.st_mtime_ns):
+        return False
+    try:
+        # Ассеты релизов GitHub отдаются через редирект, поэтому идем по нему и для HEAD
+        response = http_session.head(url, headers={'If-Modified-Since': meta['last_modified']},
+                                     allow_redirects=True, timeout=10)
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Условная проверка {url} не удалась: {e}")
+        return False
+    return response.status_code == 304
+
+def remove_downloaded_file(final_filepath):
+    """Удаляет скачанный файл вместе с метаданными его условной загрузки."""
+    os.remove(final_filepath)
+    _discard_temp_file(_get_download_meta_path(final_filepath))
+
+def download_file(url, destination_folder, filename, expected_hash=None, progress_callback=None):
+    """
+    Скачивает файл по URL в указанную папку с проверкой хеша.
+    Скачивание происходит во временный файл, который переименовывается после успешной загрузки.
+    Если файл уже скачан и сервер подтверждает, что он не менялся, повторная загрузка не выполняется.
+    """
+    os.makedirs(destination_folder, exist_ok=True) # Ensure destination exists
+    final_filepath = os.path.join(destination_folder, filename)
+    temp_filepath = final_filepath + ".tmp"
+
+    if _is_download_unchanged(url, final_filepath):
+        logger.info(f"Файл {filename} уже скачан и не изменился на сервере. Пропускаем загрузку.")
+        if progress_callback: progress_callback(1.0)
+        return final_filepath
+
+    logger.info(f"Скачивание файла {filename} из {url}")
+    try:
+        response_headers = {}
+        local_hash = _download_raw(url, temp_filepath, filename, compute_hash=bool(expected_hash),
+                                   progress_callback=progress_callback, response_headers=response_headers)
+        _finalize_download(temp_filepath, final_filepath, filename, expected_hash, local_hash)
+        _save_download_meta(final_filepath, url, response_headers.get('Last-Modified'))
         return final_filepath
 
     except (requests.exceptions.RequestException, ValueError, IOError) as e:
         logger.error(f"Ошибка при скачивании файла {filename}: {e}", exc_info=True)
-        # Удаляем временный файл в случае ошибки
-        if os.path.exists(temp_filepath):
-            try:
-                os.remove(temp_filepath)
-            except OSError:
-                pass
+        _discard_temp_file(temp_filepath)
         return None
 
-def unpack_mrpack(pack_path, temp_dir):
+def unpack_mrpack(pack_path, temp_dir, known_overrides=None):
     """
-    Распаковывает .mrpack файл во временную директорию.
+    Читает modrinth.index.json из .mrpack прямо в память и распаковывает во временную директорию
+    только overrides/ и client-overrides/ - остальное содержимое архива установке не нужно.
+    known_overrides ({имя: CRC32} прошлой установки) позволяет извлечь только изменившиеся файлы.
+    Возвращает разобранный индекс и {имя: CRC32} всех override-файлов архива.
     """
     if not os.path.exists(temp_dir):
         os.makedirs(temp_dir)
 
     logging.info(f"Unpacking {pack_path} to {temp_dir}...")
+    override_crcs = {}
     with zipfile.ZipFile(pack_path, 'r') as zip_ref:
-        zip_ref.extractall(temp_dir)
+        try:
+            modpack_data = json_utils.loads(zip_ref.read('modrinth.index.json'))
+        except KeyError:
+            raise FileNotFoundError("modrinth.index.json not found in the mrpack file.")
+        for info in zip_ref.infolist():
+            if info.filename.startswith(OVERRIDE_PREFIXES):
+                override_crcs[info.filename] = info.CRC
+                # CRC32 берется из центрального каталога архива, сами данные для сравнения не читаются
+                if known_overrides is None or known_overrides.get(info.filename) != info.CRC:
+                    zip_ref.extract(info, temp_dir)
 
-    index_path = os.path.join(temp_dir, 'modrinth.index.json')
-    
-    if not os.path.exists(index_path):
-        raise FileNotFoundError("modrinth.index.json not found in the mrpack file.")
-        
     logging.info("Unpacking complete.")
-    return index_path
-
-def parse_index(index_path):
-    """Парсит файл modrinth.index.json и возвращает данные."""
-    logging.info(f"Parsing {index_path}...")
-    with open(index_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    logging.info(f"Successfully parsed {index_path}.")
-    return data
+    return modpack_data, override_crcs
 
 def _get_sha512(filename):
-    """Вычисляет SHA512 хеш файла."""
-    sha512 = hashlib.sha512()
+    """
+    Вычисляет SHA512 хеш файла.
+    Файлы до MMAP_HASH_MAX_BYTES отображаются в память и хешируются одним update(),
+    большие читаются через hashlib.file_digest (Python 3.11+) или блоками по 1 MiB.
+    """
     try:
+        with open(filename, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if 0 < size < MMAP_HASH_MAX_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return hashlib.sha512(memoryview(mapped)).hexdigest()
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha512').hexdigest()
+        sha512 = hashlib.sha512()
         with open(filename, 'rb') as f:
             while True:
-                data = f.read(65536)  # 64kb
+                data = f.read(HASH_BLOCK_SIZE)
                 if not data:
                     break
                 sha512.update(data)
@@ -189,14 +380,14 @@ def _get_sha512(filename):
         return ""
     return sha512.hexdigest()
 
-def sync_mods_folder(config, files_from_mrpack):
+def sync_mods_folder(config, files_from_mrpack, mods_dir=None):
     """
     Синхронизирует папку mods. Удаляет моды, которых нет в новом списке,
     но не трогает моды из папки mods_disabled.
     """
-    from .paths import get_mods_dir
-    mods_dir = get_mods_dir(config)
-    if not mods_dir or not os.path.exists(mods_dir):
+    if mods_dir is None:
+        mods_dir = get_mods_dir(config)
+    if not mods_dir:
         return
 
     expected_mod_filenames = {os.path.basename(file_info['path']) for file_info in files_from_mrpack if file_info['path'].startswith('mods/')}
@@ -204,7 +395,9 @@ def sync_mods_folder(config, files_from_mrpack):
     logger.info(f"Синхронизация папки mods. Ожидается {len(expected_mod_filenames)} модов.")
 
     try:
-        actual_mod_files = {f for f in os.listdir(mods_dir) if os.path.isfile(os.path.join(mods_dir, f))}
+        # DirEntry.is_file() берет тип из записи каталога, без отдельного stat на каждый файл
+        with os.scandir(mods_dir) as entries:
+            actual_mod_files = {entry.name for entry in entries if entry.is_file()}
     except FileNotFoundError:
         return # Папки нет, нечего синхронизировать
 
@@ -224,85 +417,296 @@ def sync_mods_folder(config, files_from_mrpack):
             logger.error(f"Не удалось удалить устаревший мод {filename}: {e}")
 
 
+def _get_download_url(file_info):
+    """Определяет URL для скачивания: сначала поле 'url', затем первый элемент из 'downloads'."""
+    download_url = file_info.get('url')
+    if not download_url:
+        downloads_list = file_info.get('downloads')
+        if downloads_list and isinstance(downloads_list, list):
+            download_url = downloads_list[0]
+    return download_url
+
+def _get_download_workers():
+    """Число параллельных загрузок; для медленного интернета его можно уменьшить через KRISTORY_DOWNLOAD_WORKERS."""
+    try:
+        return max(1, int(os.environ.get('KRISTORY_DOWNLOAD_WORKERS', DOWNLOAD_WORKERS)))
+    except ValueError:
+        return DOWNLOAD_WORKERS
+
+def _get_hash_cache_path(install_dir):
+    return os.path.join(install_dir, HASH_CACHE_FILENAME)
+
+def _load_hash_cache(install_dir):
+    """Читает кеш хешей {путь из mrpack: {size, mtime_ns, sha512}}; пустой словарь, если кеша нет."""
+    try:
+        with open(_get_hash_cache_path(install_dir), 'rb') as f:
+            cache = json_utils.loads(f.read())
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_hash_cache(install_dir, cache):
+    """Атомарно сохраняет кеш хешей."""
+    try:
+        json_utils.write_json_atomic(_get_hash_cache_path(install_dir), cache)
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить кеш хешей: {e}")
+
+def _make_hash_entry(path, sha512):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha512': sha512.lower()}
+
+def _is_hash_cache_hit(entry, path, expected_hash):
+    """Файл не менялся с последней проверки (размер и mtime те же) и его хеш совпадал с ожидаемым."""
+    if not entry or entry.get('sha512') != expected_hash.lower():
+        return False
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return st.st_size == entry.get('size') and st.st_mtime_ns == entry.get('mtime_ns')
+
 def download_files(files, install_dir, progress_callback=None):
-    """Скачивает файлы из списка, пропуская те, что уже существуют и совпадают по хешу."""
+    """
+    Скачивает файлы из списка, пропуская те, что уже существуют и совпадают по хешу.
+    Возвращает множество путей из индекса, которые получить не удалось.
+    """
     total_files = len(files)
     logger.info(f"Найдено {total_files} файлов для проверки и скачивания.")
     
     if total_files == 0:
         if progress_callback: progress_callback(1.0)
-        return
-
-    for i, file_info in enumerate(files):
+        return set()
+
+    # Прогресс считается по обработанным файлам; загрузки завершаются в произвольном порядке,
+    # поэтому счетчик общий и обновляется под блокировкой
+    progress_lock = threading.Lock()
+    processed = [0]
+    failed = set()
+
+    def mark_processed():
+        with progress_lock:
+            processed[0] += 1
+            if progress_callback: progress_callback(processed[0] / total_files)
+
+    # Файлы, не изменившиеся с прошлой проверки, не перечитываем и не хешируем заново
+    hash_cache = _load_hash_cache(install_dir)
+    entries = []
+    to_hash = []
+    for file_info in files:
         path = os.path.join(install_dir, *file_info['path'].split('/'))
         expected_hash = file_info.get('hashes', {}).get('sha512')
 
-        # Progress update before check
-        if progress_callback: progress_callback(i / total_files)
-
-        if os.path.exists(path) and expected_hash:
+        if expected_hash and _is_hash_cache_hit(hash_cache.get(file_info['path']), path, expected_hash):
+            logger.debug(f"Файл {os.path.basename(path)} не изменился с прошлой проверки. Пропускаем.")
+            mark_processed()
+            continue
+        entries.append((file_info, path, expected_hash))
+        if expected_hash and os.path.exists(path):
+            to_hash.append(path)
+
+    # Фаза 1: хешируем существующие файлы параллельно (hashlib отпускает GIL на больших буферах)
+    local_hashes = {}
+    if to_hash:
+        def hash_task(path):
             try:
-                local_hash = _get_sha512(path)
-                if local_hash.lower() == expected_hash.lower():
-                    logger.info(f"Файл {os.path.basename(path)} уже существует и хеш совпадает. Пропускаем.")
-                    continue
+                return path, _get_sha512(path)
             except Exception as e:
                 logger.warning(f"Ошибка проверки хеша для {path}: {e}. Файл будет скачан заново.")
-        
-        logger.info(f"Скачивание: {os.path.basename(path)}")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-
-        # Определяем URL для скачивания: сначала поле 'url', затем первый элемент из 'downloads'
-        download_url = file_info.get('url')
-        if not download_url:
-            downloads_list = file_info.get('downloads')
-            if downloads_list and isinstance(downloads_list, list):
-                download_url = downloads_list[0]
+                return path, ""
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(to_hash)), thread_name_prefix="mrpack-hash") as executor:
+            local_hashes = dict(executor.map(hash_task, to_hash))
+
+    # Фаза 2: скачиваем только то, что отсутствует или не совпало по хешу
+    tasks = []
+    duplicates = {}
+    for file_info, path, expected_hash in entries:
+        local_hash = local_hashes.get(path)
+        if local_hash and local_hash.lower() == expected_hash.lower():
+            logger.info(f"Файл {os.path.basename(path)} уже существует и хеш совпадает. Пропускаем.")
+            try:
+                hash_cache[file_info['path']] = _make_hash_entry(path, local_hash)
+            except OSError:
+                pass
+            mark_processed()
+            continue
 
+        download_url = _get_download_url(file_info)
         if not download_url:
             logger.error(f"Не удалось определить URL для {os.path.basename(path)}. Пропуск.")
+            failed.add(file_info['path'])
+            mark_processed()
+            continue
+        # Один и тот же артефакт под несколькими путями качаем один раз, остальные копии делаем локально
+        hash_key = expected_hash.lower() if expected_hash else None
+        if hash_key and hash_key in duplicates:
+            duplicates[hash_key].append((path, file_info['path']))
             continue
+        if hash_key:
+            duplicates[hash_key] = []
+        tasks.append((download_url, path, expected_hash, file_info['path']))
 
+    def download_task(task):
+        """Сетевая стадия: только скачивание во временный файл и потоковый хеш."""
+        download_url, path, expected_hash, _ = task
+        logger.info(f"Скачивание: {os.path.basename(path)}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return _download_raw(download_url, path + ".tmp", os.path.basename(path), compute_hash=bool(expected_hash))
+
+    def finalize_task(task, future):
+        """Вторая стадия: проверка хеша и перенос файла на место, пока сеть занята следующими файлами."""
+        _, path, expected_hash, cache_key = task
+        filename = os.path.basename(path)
         try:
-            download_file(download_url, os.path.dirname(path), os.path.basename(path), expected_hash=expected_hash)
+            _finalize_download(path + ".tmp", path, filename, expected_hash, future.result())
+            if expected_hash:
+                hash_cache[cache_key] = _make_hash_entry(path, expected_hash)
+                for copy_path, copy_key in duplicates.get(expected_hash.lower(), ()):
+                    try:
+                        _link_or_copy(path, copy_path)
+                        hash_cache[copy_key] = _make_hash_entry(copy_path, expected_hash)
+                    except OSError as e:
+                        logger.error(f"Не удалось скопировать {filename} в {copy_path}: {e}")
+                        failed.add(copy_key)
+                    mark_processed()
+                duplicates.pop(expected_hash.lower(), None)
+        except (requests.exceptions.RequestException, ValueError, IOError) as e:
+            logger.error(f"Ошибка при скачивании файла {filename}: {e}", exc_info=True)
+            _discard_temp_file(path + ".tmp")
+            failed.add(cache_key)
         except Exception as e:
-            logger.error(f"Неожиданная ошибка при обработке {os.path.basename(path)}: {e}")
-        
+            logger.error(f"Неожиданная ошибка при обработке {filename}: {e}")
+            _discard_temp_file(path + ".tmp")
+            failed.add(cache_key)
+        mark_processed()
+
+    # Загрузки упираются в сеть, а не в GIL, поэтому идут параллельно; несколько файлов качаем последовательно
+    workers = 1 if len(tasks) < PARALLEL_DOWNLOAD_MIN_FILES else min(_get_download_workers(), len(tasks))
+    if tasks:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mrpack-dl") as executor:
+            futures = {executor.submit(download_task, task): task for task in tasks}
+            for future in as_completed(futures):
+                finalize_task(futures[future], future)
+
+    # Копии файлов, чей оригинал скачать не удалось, останутся несинхронизированными до следующей проверки
+    for copies in duplicates.values():
+        for copy_path, copy_key in copies:
+            logger.error(f"Пропуск {os.path.basename(copy_path)}: не удалось скачать исходный файл с тем же хешем.")
+            failed.add(copy_key)
+            mark_processed()
+
+    _save_hash_cache(install_dir, hash_cache)
     if progress_callback: progress_callback(1.0)
-    logger.info("Проверка и скачивание завершены.")
+    if failed:
+        logger.warning(f"Проверка и скачивание завершены, не удалось получить файлов: {len(failed)}.")
+    else:
+        logger.info("Проверка и скачивание завершены.")
+    return failed
+
+
+def _get_index_snapshot_path(game_dir):
+    return os.path.join(game_dir, INDEX_SNAPSHOT_FILENAME)
+
+def _load_index_snapshot(game_dir):
+    """Читает {files: {путь: sha512}, overrides: {имя: CRC32}} прошлой установки; None, если снимка нет."""
+    try:
+        with open(_get_index_snapshot_path(game_dir), 'rb') as f:
+            snapshot = json_utils.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or not isinstance(snapshot.get('files'), dict) or not isinstance(snapshot.get('overrides'), dict):
+        return None
+    return snapshot
+
+def _save_index_snapshot(game_dir, files, override_crcs, failed_paths=()):
+    """
+    Атомарно сохраняет снимок индекса рядом с .modpack_version.
+    Нескачанные файлы в снимок не попадают, чтобы следующее инкрементальное обновление их докачало.
+    """
+    snapshot = {
+        'files': {file_info['path']: file_info.get('hashes', {}).get('sha512')
+                  for file_info in files if file_info['path'] not in failed_paths},
+        'overrides': override_crcs,
+    }
+    try:
+        json_utils.write_json_atomic(_get_index_snapshot_path(game_dir), snapshot)
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить снимок индекса сборки: {e}")
 
+def _diff_index(files, snapshot_files, install_dir):
+    """
+    Возвращает файлы индекса, изменившиеся с прошлой установки (или пропавшие с диска),
+    и признак того, что из сборки удалены моды.
+    """
+    changed = []
+    for file_info in files:
+        expected_hash = file_info.get('hashes', {}).get('sha512')
+        if (not expected_hash or snapshot_files.get(file_info['path']) != expected_hash
+                or not os.path.exists(os.path.join(install_dir, *file_info['path'].split('/')))):
+            changed.append(file_info)
+    current_paths = {file_info['path'] for file_info in files}
+    mods_removed = any(path.startswith('mods/') and path not in current_paths for path in snapshot_files)
+    return changed, mods_removed
+
+def _get_index_versions(modpack_data):
+    dependencies = modpack_data.get('dependencies', {})
+    return {
+        'minecraft': dependencies.get('minecraft'),
+        'fabric': dependencies.get('fabric-loader') or dependencies.get('forge'),
+    }
 
 def install_modpack(pack_path, install_dir, progress_callback=None, update_type="full", config=None):
     """
     Основная функция для установки модпака из .mrpack файла.
-    update_type: "full" - полная установка, "incremental" - только измененные файлы
+    update_type: "full" - полная установка, "incremental" - только измененные файлы,
+    "none" - только чтение версий из индекса.
+    Возвращает версии из индекса: {'minecraft': ..., 'fabric': ...}.
     """
+    if update_type == "none":
+        with zipfile.ZipFile(pack_path, 'r') as zip_ref:
+            return _get_index_versions(json_utils.loads(zip_ref.read('modrinth.index.json')))
+
     temp_dir = os.path.join(install_dir, "temp_mrpack_installation")
+    # Пути игры вычисляем один раз на всю установку
+    game_dir = get_game_dir(config)
+    mods_dir = get_mods_dir(config)
+    # Инкрементальное обновление сверяется со снимком индекса прошлой установки; без снимка - полная
+    snapshot = _load_index_snapshot(game_dir) if update_type == "incremental" and game_dir else None
+    if update_type == "incremental" and not snapshot:
+        logging.info("No index snapshot from the previous installation, falling back to full installation")
+        update_type = "full"
     logging.info(f"Starting {'incremental' if update_type == 'incremental' else 'full'} installation of {pack_path} to {install_dir}")
     logging.info(f"Using temporary directory: {temp_dir}")
 
     try:
-        index_path = unpack_mrpack(pack_path, temp_dir)
-        modpack_data = parse_index(index_path)
+        modpack_data, override_crcs = unpack_mrpack(pack_path, temp_dir, known_overrides=snapshot['overrides'] if snapshot else None)
         files_to_download = modpack_data.get('files', [])
-        dependencies = modpack_data.get('dependencies', {})
 
-        # Синхронизируем моды на основе mrpack, если это полное обновление
-        sync_mods_folder(config, files_from_mrpack=files_to_download)
-        
-        download_files(files_to_download, install_dir, progress_callback=progress_callback)
+        if snapshot:
+            changed_files, mods_removed = _diff_index(files_to_download, snapshot['files'], install_dir)
+            logging.info(f"Incremental update: {len(changed_files)} of {len(files_to_download)} files changed")
+            # Устаревшие моды удаляем, только если сборка действительно от каких-то отказалась
+            if mods_removed:
+                sync_mods_folder(config, files_from_mrpack=files_to_download, mods_dir=mods_dir)
+            failed_paths = download_files(changed_files, install_dir, progress_callback=progress_callback)
+        else:
+            # Синхронизируем моды на основе mrpack, если это полное обновление
+            sync_mods_folder(config, files_from_mrpack=files_to_download, mods_dir=mods_dir)
+            failed_paths = download_files(files_to_download, install_dir, progress_callback=progress_callback)
         
         logging.info("Copying overrides...")
-        for override_folder in ['overrides', 'client-overrides']:
+        for override_folder in OVERRIDE_FOLDERS:
             src_dir = os.path.join(temp_dir, override_folder)
             if os.path.isdir(src_dir):
-                shutil.copytree(src_dir, install_dir, dirs_exist_ok=True)
+                _link_tree(src_dir, install_dir)
         logging.info("Overrides copied.")
         
         # Сохраняем версию после успешной установки
         # Извлекаем версию из имени файла или используем текущую дату
         version = os.path.basename(pack_path).replace('.mrpack', '')
-        save_local_version(config, version)
+        save_local_version(config, version, game_dir=game_dir)
+        if game_dir:
+            _save_index_snapshot(game_dir, files_to_download, override_crcs, failed_paths)
         
 
     except Exception as e:
@@ -319,7 +723,4 @@ def install_modpack(pack_path, install_dir, progress_callback=None, update_type=
         logging.info("Cleanup complete.")
 
     logging.info("Installation finished.")
-    return dependencies
-
-
-    
+    return _get_index_versions(modpack_data)
@@ -1,14 +1,27 @@
 import sys
 import os
 import json
-import urllib.request
 import subprocess
 import ctypes
 from ctypes import wintypes
 import traceback
 import threading
 import logging
+import logging.handlers
+import queue
+import atexit
+import functools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson не установлен - используем стандартный json
+    orjson = None
 
 # Настройка логирования
 def setup_logging():
@@ -18,11 +31,19 @@ def setup_logging():
         
         log_file = log_dir / 'installer.log'
         
+        # Файл пишет отдельный поток слушателя: вызовы логгера из GUI и из загрузки не ждут диск.
+        # Запись форматирует QueueHandler (формат ниже), поэтому у файлового обработчика своего формата нет
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        log_queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        
         logging.basicConfig(
             level=logging.DEBUG,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
+                logging.handlers.QueueHandler(log_queue),
                 logging.StreamHandler()
             ]
         )
@@ -44,6 +65,32 @@ def setup_logging():
 
 logger = setup_logging()
 
+@functools.lru_cache(maxsize=1)
+def is_admin():
+    """Проверка на права администратора (права процесса не меняются, поэтому результат кешируется)"""
+    try:
+        is_user_an_admin = ctypes.windll.shell32.IsUserAnAdmin
+        is_user_an_admin.argtypes = []
+        is_user_an_admin.restype = ctypes.c_int
+        return bool(is_user_an_admin())
+    except (AttributeError, OSError):
+        return False
+
+def relaunch_as_admin():
+    """Перезапуск с правами администратора; текущий процесс завершается"""
+    # Собранный exe запускается сам по себе, а скрипту нужен путь к нему первым аргументом;
+    # list2cmdline корректно экранирует пути с пробелами
+    args = sys.argv[1:] if getattr(sys, 'frozen', False) else sys.argv
+    ctypes.windll.shell32.ShellExecuteW(
+        None, "runas", sys.executable, subprocess.list2cmdline(args), None, 1
+    )
+    sys.exit(0)
+
+# Без прав администратора перезапускаемся до импорта PyQt6: процесс, который сразу
+# завершится, не должен загружать Qt, а пользователь быстрее увидит запрос UAC
+if __name__ == "__main__" and not is_admin():
+    relaunch_as_admin()
+
 # PyQt6 импорты
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QProgressBar, 
@@ -60,10 +107,41 @@ APP_NAME = "Kristory Launcher"
 LAUNCHER_FOLDER_NAME = "Kristory Launcher"
 WINDOW_WIDTH = 420
 WINDOW_HEIGHT = 280
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+DOWNLOAD_PARTS = 4
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024  # 4 MiB
+PARALLEL_DOWNLOAD_MIN_BYTES = 8 * 1024 * 1024  # файлы меньше качаем одним запросом
+# API релизов, страница загрузки ассета и CDN, на который она перенаправляет
+PRECONNECT_URLS = ("https://api.github.com/", "https://github.com/", "https://objects.githubusercontent.com/")
+
+# Одна сессия на запрос к API и скачивание: TCP/TLS-соединения с GitHub переиспользуются,
+# в том числе после редиректа на CDN с файлами релиза
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+))
+http_session.headers.update({'User-Agent': f"{APP_NAME} Installer"})
+
+# --- Эффекты окна (DWM) ---
+DWMWA_WINDOW_CORNER_PREFERENCE = 33
+DWMWA_SYSTEMBACKDROP_TYPE = 38
+_BACKDROP_VALUE = wintypes.DWORD(2)  # DWMSBT_MAINWINDOW
+_CORNER_VALUE = wintypes.DWORD(2)  # DWMWCP_ROUND
+
+# Сигнатура объявлена заранее, чтобы ctypes не угадывал типы аргументов при каждом вызове
+try:
+    _DwmSetWindowAttribute = ctypes.windll.dwmapi.DwmSetWindowAttribute
+    _DwmSetWindowAttribute.argtypes = [wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD]
+    _DwmSetWindowAttribute.restype = ctypes.c_long
+except (AttributeError, OSError):
+    _DwmSetWindowAttribute = None
 
 # --- Пути ---
-TEMP_DOWNLOAD_DIR = Path(os.getenv('TEMP')) / 'KRISTORYInstaller'
+TEMP_DOWNLOAD_DIR = Path(os.environ.get('TEMP') or tempfile.gettempdir()) / 'KRISTORYInstaller'
 DEFAULT_INSTALL_PATH = Path(os.environ.get('ProgramFiles', 'C:\\Program Files')) / LAUNCHER_FOLDER_NAME
+DEFAULT_INSTALL_PATH_STR = os.path.normpath(str(DEFAULT_INSTALL_PATH))
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -75,15 +153,37 @@ def resource_path(relative_path):
     return base_path / relative_path
 
 def normalize_path(path):
-    """Нормализация пути с правильными слешами для Windows"""
-    return str(Path(path).resolve())
+    """Нормализация пути с правильными слешами для Windows (только работа со строкой, без обращения к диску)"""
+    return os.path.abspath(path)
 
 def ensure_launcher_folder(install_path):
     """Убеждаемся, что путь заканчивается на 'Kristory Launcher'"""
-    path = Path(install_path)
-    if path.name != LAUNCHER_FOLDER_NAME:
-        path = path / LAUNCHER_FOLDER_NAME
-    return str(path)
+    path = os.path.normpath(install_path)
+    if os.path.basename(path) != LAUNCHER_FOLDER_NAME:
+        path = os.path.join(path, LAUNCHER_FOLDER_NAME)
+    return path
+
+def preconnect():
+    """
+    Заранее открывает TLS-соединения с хостами GitHub, пока пользователь выбирает папку.
+    Соединения остаются в пуле http_session, и запросы после нажатия "Установить" не тратят время на рукопожатие.
+    """
+    for url in PRECONNECT_URLS:
+        try:
+            http_session.head(url, timeout=5)
+        except requests.exceptions.RequestException as e:
+            logger.debug(f"Preconnect to {url} failed: {e}")
+
+def fetch_latest_release():
+    """Получение информации о последнем релизе с GitHub"""
+    api_url = f"https://api.github.com/repos/{GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}/releases/latest"
+    response = http_session.get(api_url, timeout=15)
+    if response.status_code != 200:
+        raise Exception(f"Ошибка API GitHub: {response.status_code}")
+    return orjson.loads(response.content) if orjson is not None else json.loads(response.content)
+
+class RangeNotSupportedError(Exception):
+    """Сервер проигнорировал заголовок Range и отдал файл целиком."""
 
 class Worker(QObject):
     finished = pyqtSignal()
@@ -93,26 +193,21 @@ class Worker(QObject):
     
     def __init__(self, install_path):
         super().__init__()
-        self.install_path = Path(install_path)
+        # Строковые формы путей считаются один раз и передаются в API ОС как есть
+        self.install_path_str = normalize_path(install_path)
+        self.launcher_exe_str = os.path.join(self.install_path_str, LAUNCHER_EXE_NAME)
 
     def run(self):
         setup_path = None
         try:
             # Поиск последней версии
             self.status_updated.emit("Поиск последней версии...")
-            api_url = f"https://api.github.com/repos/{GITHUB_REPO_OWNER}/{GITHUB_REPO_NAME}/releases/latest"
-            
-            with urllib.request.urlopen(api_url, timeout=15) as response:
-                if response.status != 200:
-                    raise Exception(f"Ошибка API GitHub: {response.status}")
-                release_data = json.loads(response.read().decode())
+            TEMP_DOWNLOAD_DIR.mkdir(exist_ok=True)
+            release_data = fetch_latest_release()
             
             # Поиск нужного артефакта
-            asset_info = None
-            for asset in release_data.get("assets", []):
-                if asset["name"].startswith(FULL_SETUP_ARTIFACT_NAME):
-                    asset_info = asset
-                    break
+            asset_info = next((asset for asset in release_data.get("assets", ())
+                               if asset["name"].startswith(FULL_SETUP_ARTIFACT_NAME)), None)
             
             if not asset_info:
                 raise Exception(f"Артефакт '{FULL_SETUP_ARTIFACT_NAME}*.exe' не найден.")
@@ -120,44 +215,37 @@ class Worker(QObject):
             download_url = asset_info["browser_download_url"]
             filename = asset_info["name"]
             total_size = asset_info["size"]
+            # По id и дате обновления ассета проверяем, что недокачанный .part относится к тому же файлу
+            asset_key = {"id": asset_info.get("id"), "updated_at": asset_info.get("updated_at"), "size": total_size}
             
-            # Создание временной директории
-            TEMP_DOWNLOAD_DIR.mkdir(exist_ok=True)
             setup_path = TEMP_DOWNLOAD_DIR / filename
             
             # Скачивание установщика
             self.status_updated.emit("Скачивание установщика...")
-            self._download_file(download_url, setup_path, total_size)
+            self._download_file(download_url, setup_path, total_size, asset_key)
             
             # Установка
             self.status_updated.emit("Установка лаунчера...")
             self.progress_updated.emit(100)
             
-            # Нормализация пути установки
-            normalized_install_path = normalize_path(self.install_path)
-            logger.info(f"Using installation path: {normalized_install_path}")
+            logger.info(f"Using installation path: {self.install_path_str}")
             
             # Проверка доступности установщика
             if not setup_path.exists():
                 raise FileNotFoundError(f"Установщик не найден: {setup_path}")
             
             # Запуск установщика
-            self._run_installer(setup_path, normalized_install_path)
+            self._run_installer(setup_path, self.install_path_str)
             
             self.status_updated.emit("Установка завершена!")
             
             # Запуск лаунчера
-            launcher_exe_path = Path(normalized_install_path) / LAUNCHER_EXE_NAME
-            
-            if not launcher_exe_path.exists():
-                raise Exception(f"Не удалось найти {launcher_exe_path}.\n"
+            if not os.path.exists(self.launcher_exe_str):
+                raise Exception(f"Не удалось найти {self.launcher_exe_str}.\n"
                               f"Проверьте права доступа к директории и наличие исполняемого файла.")
             
-            # Запуск лаунчера в отдельном процессе
-            subprocess.Popen([str(launcher_exe_path)], 
-                           cwd=str(launcher_exe_path.parent),
-                           creationflags=subprocess.DETACHED_PROCESS,
-                           close_fds=True)
+            # Запуск лаунчера через ShellExecute: процесс не связан с установщиком, и тот может сразу завершиться
+            os.startfile(self.launcher_exe_str, cwd=self.install_path_str)
             
             self.finished.emit()
             
@@ -172,20 +260,141 @@ class Worker(QObject):
                 except OSError as e:
                     logger.warning(f"Could not remove temp file: {e}")
 
-    def _download_file(self, url, output_path, total_size):
-        """Скачивание файла с прогрессом"""
-        downloaded_size = 0
-        chunk_size = 8192
-        
-        with urllib.request.urlopen(url) as response, open(output_path, 'wb') as out_file:
-            while True:
-                chunk = response.read(chunk_size)
-                if not chunk:
-                    break
-                out_file.write(chunk)
-                downloaded_size += len(chunk)
-                percent = int((downloaded_size / total_size) * 100)
-                self.progress_updated.emit(percent)
+    def _download_file(self, url, output_path, total_size, asset_key):
+        """
+        Скачивание файла с прогрессом во временный .part файл.
+        Оставшийся от прерванной попытки .part того же ассета (asset_key записан рядом в .part.json)
+        докачивается с места обрыва, иначе файл качается несколькими частями параллельно,
+        если сервер поддерживает Range.
+        """
+        part_path = output_path.with_name(output_path.name + '.part')
+        part_meta_path = output_path.with_name(output_path.name + '.part.json')
+        resume_from = self._get_resumable_size(part_path, part_meta_path, asset_key)
+
+        if 0 < resume_from < total_size:
+            logger.info(f"Resuming download from byte {resume_from}")
+            self._download_single(url, part_path, total_size, resume_from)
+        else:
+            part_meta_path.write_text(json.dumps(asset_key), encoding='utf-8')
+            downloaded = False
+            if total_size >= PARALLEL_DOWNLOAD_MIN_BYTES:
+                try:
+                    self._download_ranges(url, part_path, total_size)
+                    downloaded = True
+                except RangeNotSupportedError:
+                    logger.info("Server does not support range requests, falling back to a single download")
+                except Exception:
+                    # Файл заранее выделен целиком, поэтому после сбоя частей докачивать его нельзя
+                    part_path.unlink(missing_ok=True)
+                    raise
+            if not downloaded:
+                self._download_single(url, part_path, total_size)
+        os.replace(part_path, output_path)
+        part_meta_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _get_resumable_size(part_path, part_meta_path, asset_key):
+        """Размер .part, если он оставлен загрузкой того же ассета; иначе .part удаляется и возвращается 0"""
+        try:
+            resume_from = part_path.stat().st_size
+            recorded_key = json.loads(part_meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            resume_from, recorded_key = 0, None
+        if resume_from and recorded_key == asset_key:
+            return resume_from
+        if resume_from:
+            logger.info("Partial download belongs to another release asset, starting over")
+        part_path.unlink(missing_ok=True)
+        return 0
+
+    def _download_single(self, url, output_path, total_size, resume_from=0):
+        """Скачивание файла одним запросом; при resume_from > 0 запрашивается только недостающий хвост"""
+        headers = {'Range': f"bytes={resume_from}-"} if resume_from else None
+        
+        with http_session.get(url, headers=headers, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            if resume_from and response.status_code == 200:
+                logger.info("Server ignored the range request, restarting download from scratch")
+                resume_from = 0
+            elif resume_from and not self._is_resumed_response(response, resume_from, total_size):
+                # Хвост не совпадает с уже скачанной частью - в следующий раз качаем заново
+                output_path.unlink(missing_ok=True)
+                raise IOError(f"Сервер вернул неожиданный диапазон: {response.headers.get('Content-Range')}")
+            downloaded_size = resume_from
+            last_percent = -1
+            
+            with open(output_path, 'ab' if resume_from else 'wb', buffering=WRITE_BUFFER_SIZE) as out_file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    out_file.write(chunk)
+                    downloaded_size += len(chunk)
+                    # Сигнал в GUI-поток отправляем только при смене процента
+                    percent = downloaded_size * 100 // total_size if total_size else 0
+                    if percent != last_percent:
+                        last_percent = percent
+                        self.progress_updated.emit(percent)
+                # Один fsync в конце: установщик запускается только с данными, уже записанными на диск
+                out_file.flush()
+                os.fsync(out_file.fileno())
+
+        if total_size and downloaded_size != total_size:
+            raise IOError(f"Файл скачан не полностью: {downloaded_size} из {total_size} байт")
+
+    @staticmethod
+    def _is_resumed_response(response, resume_from, total_size):
+        """Проверяет, что сервер отдал именно хвост файла с байта resume_from (206 и корректный Content-Range)"""
+        if response.status_code != 206:
+            return False
+        # Content-Range: bytes <начало>-<конец>/<размер>
+        content_range = response.headers.get('Content-Range', '')
+        byte_range, _, size = content_range.removeprefix('bytes ').partition('/')
+        try:
+            start = int(byte_range.partition('-')[0])
+            return start == resume_from and (size == '*' or int(size) == total_size)
+        except ValueError:
+            return False
+
+    def _download_ranges(self, url, output_path, total_size):
+        """
+        Скачивание файла DOWNLOAD_PARTS частями по Range параллельно.
+        Каждая часть пишется своим дескриптором в свой участок заранее выделенного файла, поэтому запись не требует блокировки.
+        """
+        part_size = -(-total_size // DOWNLOAD_PARTS)
+        ranges = [(start, min(start + part_size, total_size) - 1) for start in range(0, total_size, part_size)]
+        progress_lock = threading.Lock()
+        progress = {'downloaded': 0, 'percent': -1}
+
+        with open(output_path, 'wb') as out_file:
+            out_file.truncate(total_size)
+
+        def download_range(byte_range):
+            start, end = byte_range
+            headers = {'Range': f"bytes={start}-{end}"}
+            with http_session.get(url, headers=headers, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise RangeNotSupportedError()
+                written = 0
+                with open(output_path, 'r+b', buffering=WRITE_BUFFER_SIZE) as out_file:
+                    out_file.seek(start)
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        out_file.write(chunk)
+                        written += len(chunk)
+                        with progress_lock:
+                            progress['downloaded'] += len(chunk)
+                            percent = progress['downloaded'] * 100 // total_size
+                            if percent != progress['percent']:
+                                progress['percent'] = percent
+                                self.progress_updated.emit(percent)
+            if written != end - start + 1:
+                raise IOError(f"Часть {start}-{end} скачана не полностью: {written} байт")
+
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="setup-dl") as executor:
+            # list() пробрасывает первое исключение из частей
+            list(executor.map(download_range, ranges))
+
+        # Части закрыты и сброшены в ОС; один fsync на весь файл перед запуском установщика
+        with open(output_path, 'r+b') as out_file:
+            os.fsync(out_file.fileno())
 
     def _run_installer(self, setup_path, install_path):
         """Запуск NSIS установщика"""
@@ -199,27 +408,112 @@ class Worker(QObject):
                 check=False,
                 creationflags=subprocess.CREATE_NO_WINDOW,
                 timeout=300,
-                capture_output=True,
-                text=True
+                # Тихий NSIS ничего не пишет в stdout; stderr нужен только для сообщения об ошибке
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
             )
             
             if result.returncode != 0:
+                stderr = result.stderr.decode('utf-8', errors='replace')
                 logger.error(f"Installation failed with code {result.returncode}")
-                logger.error(f"Stdout: {result.stdout}")
-                logger.error(f"Stderr: {result.stderr}")
+                logger.error(f"Stderr: {stderr}")
                 raise Exception(f"Установщик вернул код ошибки {result.returncode}.\n"
-                              f"Stdout: {result.stdout}\n"
-                              f"Stderr: {result.stderr}")
+                              f"Stderr: {stderr}")
                               
         except subprocess.TimeoutExpired:
             raise Exception("Установщик не отвечает более 5 минут")
         except Exception as e:
             raise Exception(f"Ошибка при запуске установщика: {e}")
 
+# Стили окна: строка собирается один раз при импорте, а не при каждом создании окна
+STYLESHEET = """
+    #CentralWidget {
+        background-color: #26152D;
+        border: 1px solid rgba(255, 255, 255, 0.1);
+    }
+    #TitleLabel {
+        color: #E5E7EB;
+        font-size: 14px;
+        font-family: "Segoe UI", sans-serif;
+        font-weight: bold;
+        padding-left: 20px;
+    }
+    #CloseButton {
+        color: #E5E7EB;
+        font-family: "Segoe UI", sans-serif;
+        font-size: 16px;
+        background-color: transparent;
+        border: none;
+        padding: 5px 15px;
+    }
+    #CloseButton:hover {
+        background-color: rgba(255, 255, 255, 0.1);
+    }
+    #InstallButton {
+        background-color: #A24BE0;
+        color: white;
+        font-size: 16px;
+        font-weight: bold;
+        font-family: "Segoe UI", sans-serif;
+        padding: 12px 60px;
+        border-radius: 8px;
+        border: none;
+    }
+    #InstallButton:hover {
+        background-color: #8E3FD3;
+    }
+    #InstallButton:disabled {
+        background-color: #512863;
+        color: #D6C2EF;
+    }
+    #StatusLabel {
+        color: #D6C2EF;
+        font-size: 13px;
+        font-family: "Segoe UI", sans-serif;
+        min-height: 18px;
+    }
+    #PathLabel {
+        color: #E5E7EB;
+        font-size: 14px;
+        margin-bottom: 8px;
+        font-family: "Segoe UI", sans-serif;
+    }
+    #PathEdit {
+        background-color: rgba(0,0,0,0.3);
+        border: 1px solid #9B59B6;
+        border-radius: 6px;
+        padding: 8px;
+        color: #E5E7EB;
+        font-family: "Segoe UI", sans-serif;
+    }
+    #BrowseButton {
+        background-color: #512863;
+        color: white;
+        border: 1px solid #9B59B6;
+        border-radius: 6px;
+        padding: 8px 12px;
+        font-family: "Segoe UI", sans-serif;
+    }
+    #BrowseButton:hover {
+        background-color: #613872;
+    }
+    #ProgressBar {
+        min-height: 6px;
+        max-height: 6px;
+        border-radius: 3px;
+        background-color: #512863;
+    }
+    #ProgressBar::chunk {
+        background-color: #A24BE0;
+        border-radius: 3px;
+    }
+"""
+
 class DownloaderApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.old_pos = None
+        threading.Thread(target=preconnect, name="preconnect", daemon=True).start()
         self._setup_window()
         self._setup_ui()
         
@@ -242,21 +536,18 @@ class DownloaderApp(QMainWindow):
         
     def _apply_window_effects(self):
         """Применение нативных эффектов Windows"""
+        if _DwmSetWindowAttribute is None:
+            return
         try:
-            hwnd = wintypes.HWND(int(self.winId()))
-            dwmapi = ctypes.windll.dwmapi
+            hwnd = int(self.winId())
             
             # Применение backdrop эффекта
-            DWMWA_SYSTEMBACKDROP_TYPE = 38
-            value = wintypes.DWORD(2)
-            dwmapi.DwmSetWindowAttribute(hwnd, DWMWA_SYSTEMBACKDROP_TYPE, 
-                                       ctypes.byref(value), ctypes.sizeof(value))
+            _DwmSetWindowAttribute(hwnd, DWMWA_SYSTEMBACKDROP_TYPE, 
+                                   ctypes.byref(_BACKDROP_VALUE), ctypes.sizeof(_BACKDROP_VALUE))
             
             # Скругление углов
-            DWMWA_WINDOW_CORNER_PREFERENCE = 33
-            value = wintypes.DWORD(2)
-            dwmapi.DwmSetWindowAttribute(hwnd, DWMWA_WINDOW_CORNER_PREFERENCE, 
-                                       ctypes.byref(value), ctypes.sizeof(value))
+            _DwmSetWindowAttribute(hwnd, DWMWA_WINDOW_CORNER_PREFERENCE, 
+                                   ctypes.byref(_CORNER_VALUE), ctypes.sizeof(_CORNER_VALUE))
                                        
         except Exception as e:
             logger.warning(f"Не удалось применить нативные эффекты Windows: {e}")
@@ -312,7 +603,7 @@ class DownloaderApp(QMainWindow):
         path_label = QLabel("Папка для установки лаунчера:")
         path_label.setObjectName("PathLabel")
         
-        self.path_edit = QLineEdit(str(DEFAULT_INSTALL_PATH))
+        self.path_edit = QLineEdit(DEFAULT_INSTALL_PATH_STR)
         self.path_edit.setObjectName("PathEdit")
         
         browse_button = QPushButton("Обзор...")
@@ -353,30 +644,20 @@ class DownloaderApp(QMainWindow):
     
     def browse_folder(self):
         """Выбор папки для установки"""
-        current_path = Path(self.path_edit.text())
-        base_directory = current_path.parent if current_path.name == LAUNCHER_FOLDER_NAME else current_path
+        current_path = os.path.normpath(self.path_edit.text())
+        base_directory = os.path.dirname(current_path) if os.path.basename(current_path) == LAUNCHER_FOLDER_NAME else current_path
         
         directory = QFileDialog.getExistingDirectory(
             self, 
             "Выберите папку для установки", 
-            str(base_directory)
+            base_directory
         )
         
         if directory:
+            # Папка создается только при установке, выбор пути лишь показывает его
             install_path = ensure_launcher_folder(directory)
-            
-            # Создаем папку если её нет
-            try:
-                Path(install_path).mkdir(parents=True, exist_ok=True)
-                logger.info(f"Install path set to: {install_path}")
-                self.path_edit.setText(install_path)
-            except Exception as e:
-                logger.error(f"Failed to create folder: {e}")
-                QMessageBox.critical(
-                    self, 
-                    "Ошибка", 
-                    f"Не удалось создать папку {install_path}.\nОшибка: {str(e)}"
-                )
+            logger.info(f"Install path set to: {install_path}")
+            self.path_edit.setText(install_path)
 
     def start_installation(self):
         """Начало установки"""
@@ -466,88 +747,7 @@ class DownloaderApp(QMainWindow):
 
     def _apply_styles(self):
         """Применение стилей"""
-        self.setStyleSheet("""
-            #CentralWidget {
-                background-color: #26152D;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-            }
-            #TitleLabel {
-                color: #E5E7EB;
-                font-size: 14px;
-                font-family: "Segoe UI", sans-serif;
-                font-weight: bold;
-                padding-left: 20px;
-            }
-            #CloseButton {
-                color: #E5E7EB;
-                font-family: "Segoe UI", sans-serif;
-                font-size: 16px;
-                background-color: transparent;
-                border: none;
-                padding: 5px 15px;
-            }
-            #CloseButton:hover {
-                background-color: rgba(255, 255, 255, 0.1);
-            }
-            #InstallButton {
-                background-color: #A24BE0;
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-                font-family: "Segoe UI", sans-serif;
-                padding: 12px 60px;
-                border-radius: 8px;
-                border: none;
-            }
-            #InstallButton:hover {
-                background-color: #8E3FD3;
-            }
-            #InstallButton:disabled {
-                background-color: #512863;
-                color: #D6C2EF;
-            }
-            #StatusLabel {
-                color: #D6C2EF;
-                font-size: 13px;
-                font-family: "Segoe UI", sans-serif;
-                min-height: 18px;
-            }
-            #PathLabel {
-                color: #E5E7EB;
-                font-size: 14px;
-                margin-bottom: 8px;
-                font-family: "Segoe UI", sans-serif;
-            }
-            #PathEdit {
-                background-color: rgba(0,0,0,0.3);
-                border: 1px solid #9B59B6;
-                border-radius: 6px;
-                padding: 8px;
-                color: #E5E7EB;
-                font-family: "Segoe UI", sans-serif;
-            }
-            #BrowseButton {
-                background-color: #512863;
-                color: white;
-                border: 1px solid #9B59B6;
-                border-radius: 6px;
-                padding: 8px 12px;
-                font-family: "Segoe UI", sans-serif;
-            }
-            #BrowseButton:hover {
-                background-color: #613872;
-            }
-            #ProgressBar {
-                min-height: 6px;
-                max-height: 6px;
-                border-radius: 3px;
-                background-color: #512863;
-            }
-            #ProgressBar::chunk {
-                background-color: #A24BE0;
-                border-radius: 3px;
-            }
-        """)
+        self.setStyleSheet(STYLESHEET)
 
     # Обработка событий мыши для перетаскивания окна
     def mousePressEvent(self, event):
@@ -565,25 +765,12 @@ class DownloaderApp(QMainWindow):
         self.move(self.x() + delta.x(), self.y() + delta.y())
         self.old_pos = event.globalPosition().toPoint()
 
-def is_admin():
-    """Проверка на права администратора"""
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
-    except:
-        return False
-
 def main():
-    """Основная функция"""
-    if is_admin():
-        app = QApplication(sys.argv)
-        window = DownloaderApp()
-        window.show()
-        sys.exit(app.exec())
-    else:
-        # Перезапуск с правами администратора
-        ctypes.windll.shell32.ShellExecuteW(
-            None, "runas", sys.executable, " ".join(sys.argv), None, 1
-        )
+    """Основная функция (права администратора уже проверены до импорта PyQt6)"""
+    app = QApplication(sys.argv)
+    window = DownloaderApp()
+    window.show()
+    sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()